@@ -1,24 +1,17 @@
 import re
-import sys
+import sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "kirmaadaa_v0"))
+from kirmaadaa.decode import decode_frames, parse_words
 
 # Function to decode a single slice (matrix string) into a 10x8 matrix
 def decode_matrix(matrix_str):
     try:
-        # Parse the input string into a list of integers
-        matrix = [int(x, 16) for x in re.findall(r"0x[0-9A-Fa-f]+", matrix_str)]
-
-        # Initialize a 10x8 matrix with zeros
-        output_matrix = [[0 for _ in range(len(matrix))] for _ in range(10)]
+        # Parse the input string into an array of 32-bit words
+        matrix = parse_words([matrix_str])[0]
 
-        # Process each 32-bit word
-        for col, word in enumerate(matrix):
-            for row in range(10):
-                if row < 8:
-                    output_matrix[row][col] = (word >> (row + 8)) & 1
-                elif row == 8:
-                    output_matrix[row][col] = (word >> 16) & 1
-                elif row == 9:
-                    output_matrix[row][col] = (word >> 26) & 1
+        # Unpack all 10 row bits of every column in one pass
+        output_matrix = decode_frames(matrix, 10)
 
         return output_matrix
 
@@ -34,8 +27,8 @@ def parse_framedata(file_path):
     # Extract each slice (row of 8 hex values) as a separate string
     slices = re.findall(r"{\s*([0x0-9A-Fa-f, ]+)\s*}", content)
 
-    # Decode each slice using the decode_matrix function
-    decoded_slices = [decode_matrix(slice_str) for slice_str in slices]
+    # Decode all slices at once into a (slices, 10, columns) array
+    decoded_slices = decode_frames(parse_words(slices), 10)
     return decoded_slices
 
 # Format and print the output matrices
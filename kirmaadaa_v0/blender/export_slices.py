@@ -0,0 +1,54 @@
+import bpy
+import os
+import sys
+import argparse
+
+# Shared tooling lives in kirmaadaa_v0/kirmaadaa, next to this folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from kirmaadaa.blender_mesh import animation_meshes
+from kirmaadaa.container import write_framedata
+from kirmaadaa.emit import write_header, write_json
+from kirmaadaa.layout import BOARDS
+from kirmaadaa.render import render_words
+
+# Blender passes its own arguments first; ours follow '--'
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+parser = argparse.ArgumentParser(
+    prog="blender --background <file.blend> --python export_slices.py --",
+    description="Render an object's animation straight into framedata without writing PNGs.")
+parser.add_argument("object", help="Name of the object to render.")
+parser.add_argument("output", help="Output file (.h, .json or .kfd).")
+parser.add_argument("--board", choices=sorted(BOARDS), default="wedge", help="LED board pin layout.")
+parser.add_argument("--radius", type=float, default=1.0, help="Panel half width in scene units.")
+parser.add_argument("--height", type=float, default=2.0, help="Panel height in scene units, centred on z=0.")
+parser.add_argument("--mode", choices=("solid", "shell"), default="shell", help="Light filled cells or only the surface.")
+parser.add_argument("--supersample", type=int, default=2, help="Samples per LED cell along each axis.")
+args = parser.parse_args(argv)
+
+if args.object not in bpy.data.objects:
+    print(f"Error: Object '{args.object}' not found in the scene")
+    sys.exit(1)
+
+obj = bpy.data.objects[args.object]
+layout = BOARDS[args.board]
+scene = bpy.context.scene
+frames = scene.frame_end - scene.frame_start + 1
+
+# Frames are rendered lazily and streamed to the output one at a time
+words = (
+    render_words(vertices, triangles, layout, args.radius, args.height,
+                 mode=args.mode, supersample=args.supersample)
+    for vertices, triangles in animation_meshes(obj)
+)
+
+if args.output.endswith(".kfd"):
+    write_framedata(args.output, words, layout.rows, layout, frames)
+else:
+    with open(args.output, "w") as f:
+        if args.output.endswith(".json"):
+            write_json(words, f, rows=layout.rows, frames=frames)
+        else:
+            write_header(words, f, frames=frames)
+
+print(f"Rendered {frames} frame(s) of '{args.object}' to '{args.output}'")
@@ -1,63 +1,60 @@
 import bpy
 import numpy as np
 import os
+import sys
 import json
 
+# Shared tooling lives in kirmaadaa_v0/kirmaadaa, next to this folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from kirmaadaa.capture import FrameCapture, read_capture
+from kirmaadaa.instrument import debug, log
+
 # Set up output directory
 output_dir = "Q:\extra\kirmaadaa_3d\\blender\wireframe_plus_8x8"  # Replace with your path
 os.makedirs(output_dir, exist_ok=True)
 
-# Initialize a list to store binary frames
-binary_frames = []
-
-def process_rendered_frame():
-    """Process the rendered frame and convert it to a binary array."""
-    try:
-        # Access the rendered frame
-        rendered_image = bpy.data.images.get('Render Result')
-
-        # Check if the rendered image exists
-        if not rendered_image:
-            print("Error: 'Render Result' not found. Skipping frame.")
-            return
-
-        # Get pixel data (RGBA as a flat list)
-        pixels = list(rendered_image.pixels)
+# Frames are appended here as they render, so a crashed render resumes where it stopped
+capture_file = os.path.join(output_dir, "binary_frames.kcap")
 
-        # Check if the pixel data is valid
-        if not pixels:
-            print("Error: 'Render Result' has no pixel data. Skipping frame.")
-            return
+def process_rendered_frame(capture, scene):
+    """Threshold the rendered frame and append it to the capture file."""
+    # Access the rendered frame
+    rendered_image = bpy.data.images.get('Render Result')
 
-        # Get image dimensions
-        width, height = rendered_image.size
-        if width != 8 or height != 8:
-            print(f"Error: Rendered frame is not 8x8 pixels (found {width}x{height}). Skipping frame.")
-            return
+    # Check if the rendered image exists
+    if not rendered_image:
+        print("Error: 'Render Result' not found. Skipping frame.")
+        return
 
-        # Convert pixels to NumPy array and reshape to (height, width, 4)
-        frame_array = np.array(pixels).reshape((height, width, 4))
-
-        # Convert to grayscale by averaging RGB channels
-        grayscale_frame = np.mean(frame_array[:, :, :3], axis=2)
-
-        # Threshold to convert to binary (0 or 1)
-        binary_frame = (grayscale_frame > 0.5).astype(np.uint8)
-
-        # Append to the binary frames list
-        binary_frames.append(binary_frame.tolist())  # Convert NumPy array to Python list for JSON/CSV
-        print(f"Frame processed successfully: {len(binary_frames)} frame(s) so far.")
-
-    except Exception as e:
-        print(f"Unexpected error while processing the frame: {e}")
+    try:
+        capture.capture(rendered_image, scene.frame_current)
+        debug(f"Frame processed successfully: {capture.count} frame(s) so far.")
+    except ValueError as e:
+        print(f"Error: {e}. Skipping frame.")
 
 def render_animation():
-    """Render the animation frame by frame and process each frame."""
-    bpy.app.handlers.render_post.append(lambda scene: process_rendered_frame())
-    bpy.ops.render.render(animation=True)
+    """Render the animation frame by frame, skipping frames already captured."""
+    scene = bpy.context.scene
+    frame_start = scene.frame_start
+    with FrameCapture(capture_file, 8, 8) as capture:
+        if capture.last_frame is not None:
+            if capture.last_frame >= scene.frame_end:
+                log(f"All frames already captured in {capture_file}")
+                return
+            scene.frame_start = max(frame_start, capture.last_frame + 1)
+            log(f"Resuming from frame {scene.frame_start}")
+
+        handler = lambda scene, *args: process_rendered_frame(capture, scene)
+        bpy.app.handlers.render_post.append(handler)
+        try:
+            bpy.ops.render.render(animation=True)
+        finally:
+            bpy.app.handlers.render_post.remove(handler)
+            scene.frame_start = frame_start
 
 def save_as_csv():
     """Save the binary frames as a CSV file."""
+    _, binary_frames = read_capture(capture_file)
     csv_file = os.path.join(output_dir, "binary_frames.csv")
     with open(csv_file, "w") as f:
         for frame_index, frame in enumerate(binary_frames):
@@ -65,14 +62,15 @@ def save_as_csv():
                 f.write(",".join(map(str, row)) + "\n")  # Write each row
             if frame_index < len(binary_frames) - 1:
                 f.write("\n")  # Separate frames with a blank line
-    print(f"Binary frames saved as a CSV file at {csv_file}")
+    log(f"Binary frames saved as a CSV file at {csv_file}")
 
 def save_as_json():
     """Save the binary frames as a JSON file."""
+    _, binary_frames = read_capture(capture_file)
     json_file = os.path.join(output_dir, "binary_frames.json")
     with open(json_file, "w") as f:
-        json.dump(binary_frames, f, indent=4)
-    print(f"Binary frames saved as a JSON file at {json_file}")
+        json.dump(np.asarray(binary_frames).tolist(), f, indent=4)
+    log(f"Binary frames saved as a JSON file at {json_file}")
 
 def main():
     """Main function to render and save the animation."""
@@ -1,12 +1,25 @@
 import bpy
 import numpy as np
 import os
+import sys
 import json
 from pathlib import Path
 from mathutils import Vector
 
+# Shared tooling lives in kirmaadaa_v0/kirmaadaa, two levels above this blend file
+sys.path.insert(0, os.path.join(os.path.dirname(bpy.data.filepath), "..", ".."))
+from kirmaadaa.blender_mesh import mesh_arrays
+from kirmaadaa.volume import save_volume
+from kirmaadaa.voxelize import voxelize_grid
 
-def export_voxel_data(obj_name, resolution, output_filename):
+
+def export_voxel_data(obj_name, resolution, output_filename, mode="ray"):
+    """Voxelize an object into a resolution^3 grid.
+
+    mode "ray" casts one +Z ray per voxel and marks voxels below the surface.
+    mode "scanline" intersects one line per (x, y) column and fills the inside
+    intervals by crossing parity, which scales to 128^3 and beyond.
+    """
     # Ensure the object exists
     if obj_name not in bpy.data.objects:
         raise ValueError(f"Object '{obj_name}' not found in the scene")
@@ -24,15 +37,23 @@ def export_voxel_data(obj_name, resolution, output_filename):
     y_range = np.linspace(bbox_min.y, bbox_max.y, resolution)
     z_range = np.linspace(bbox_min.z, bbox_max.z, resolution)
     
-    # Sample points
-    for ix, x in enumerate(x_range):
-        for iy, y in enumerate(y_range):
-            for iz, z in enumerate(z_range):
-                point = (x, y, z)
-                # Use local coordinates for ray_cast
-                point_local = obj.matrix_world.inverted() @ Vector(point)
-                if obj.ray_cast(point_local, (0, 0, 1))[0]:
-                    voxel_grid[ix, iy, iz] = 1
+    if mode == "scanline":
+        # One line per column through the world-space mesh, filled by parity
+        vertices, triangles = mesh_arrays(obj)
+        voxel_grid[:] = voxelize_grid(vertices, triangles, x_range, y_range, z_range)
+    elif mode == "ray":
+        # Sample points
+        matrix_inv = obj.matrix_world.inverted()
+        for ix, x in enumerate(x_range):
+            for iy, y in enumerate(y_range):
+                for iz, z in enumerate(z_range):
+                    point = (x, y, z)
+                    # Use local coordinates for ray_cast
+                    point_local = matrix_inv @ Vector(point)
+                    if obj.ray_cast(point_local, (0, 0, 1))[0]:
+                        voxel_grid[ix, iy, iz] = 1
+    else:
+        raise ValueError(f"Unknown voxelization mode '{mode}'")
     
     # Get the directory of the current blend file
     blend_file_path = bpy.data.filepath
@@ -43,8 +64,11 @@ def export_voxel_data(obj_name, resolution, output_filename):
     output_file = os.path.join(blend_file_dir, output_filename)
     
     try:
-        # Save as numpy file
-        np.save(output_file, voxel_grid)
+        # Save as a bit-packed .kvx volume, or as a numpy file
+        if output_filename.endswith(".kvx"):
+            save_volume(output_file, voxel_grid, {"x": resolution, "y": resolution, "z": resolution})
+        else:
+            np.save(output_file, voxel_grid)
         print(f"Successfully saved voxel data to {output_file}")
         print(f"Grid shape: {voxel_grid.shape}")
         print(f"Number of occupied voxels: {np.sum(voxel_grid)}")
@@ -68,13 +92,19 @@ def save_npy_as_json(npy_file, json_file):
     
     print(f"Voxel data saved to {json_file}")
 
+# Also write voxel_data.npy and voxel_data.json, for the tools that still read JSON
+EXPORT_JSON = True
+
 # Example usage - save in same directory as blend file
 try:
-    export_voxel_data("plus", 32, "voxel_data.npy")
+    export_voxel_data("plus", 32, "voxel_data.kvx", mode="scanline")
 except Exception as e:
     print(f"Error during export: {str(e)}")
-    
-try:
-    save_npy_as_json("voxel_data.npy", "voxel_data.json")
-except Exception as e:
-    print(f"Error during export: {str(e)}")
\ No newline at end of file
+
+if EXPORT_JSON:
+    blend_dir = os.path.dirname(bpy.data.filepath)
+    try:
+        export_voxel_data("plus", 32, "voxel_data.npy", mode="scanline")
+        save_npy_as_json(os.path.join(blend_dir, "voxel_data.npy"), os.path.join(blend_dir, "voxel_data.json"))
+    except Exception as e:
+        print(f"Error during export: {str(e)}")
\ No newline at end of file
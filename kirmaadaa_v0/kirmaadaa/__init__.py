@@ -0,0 +1,19 @@
+"""Shared framedata tooling for the kirmaadaa volumetric display."""
+
+from .bvh import BVH
+from .container import read_framedata, write_framedata
+from .decode import as_bool, decode_frames, decode_pixels, parse_words
+from .emit import JsonWriter, write_header, write_json
+from .encode import (
+    encode_frames,
+    group_slices,
+    load_image,
+    load_images,
+    load_sprite_sheet,
+)
+from .formats import load_framedata, load_header, load_json
+from .layout import BOARD_8X8, BOARD_8X10, BOARD_WEDGE, BOARDS, Layout, WideLayout
+from .palette import deduplicate, expand, palette_stats, write_palette_header
+from .render import render_slices, render_words
+from .volume import VolumeReader, VolumeWriter, load_volume, save_volume
+from .voxelize import CylinderGrid, column_hits, fill_columns, voxelize_cylinder, voxelize_grid
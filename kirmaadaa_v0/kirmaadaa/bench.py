@@ -0,0 +1,338 @@
+"""Benchmarks of the framedata hot paths, from PNG loading and encoding to parsing, diffing, emitting and voxelizing.
+
+Every case builds seeded synthetic data at a few scales, times the hot call
+and appends the run to a JSON history, then compares it with the previous
+run in that history:
+
+    python -m kirmaadaa.bench --filter encode decode --history bench_history.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from .layout import BOARD_8X10, BOARD_WEDGE, WideLayout
+
+SEED = 1234
+
+# name -> (scales, unit, setup); setup(scale, rng) returns (callable, items per call),
+# plus a cleanup callable when it leaves files behind
+BENCHMARKS = {}
+
+
+def benchmark(name, scales, unit="frames"):
+    """Register a setup function as a benchmark case run at each of ``scales``."""
+    def register(setup):
+        BENCHMARKS[name] = (scales, unit, setup)
+        return setup
+    return register
+
+
+def uv_sphere(n_lat=32, n_lon=64, radius=0.8):
+    """Closed triangulated UV sphere centred on the origin, as (vertices, faces)."""
+    theta = np.linspace(0, np.pi, n_lat + 1)[1:-1]
+    phi = np.linspace(0, 2 * np.pi, n_lon, endpoint=False)
+    t, p = np.meshgrid(theta, phi, indexing="ij")
+    ring = np.stack([np.sin(t) * np.cos(p), np.sin(t) * np.sin(p), np.cos(t)], axis=-1).reshape(-1, 3)
+    vertices = np.concatenate([[[0, 0, 1]], ring, [[0, 0, -1]]]) * radius
+
+    j = np.arange(n_lon)
+    k = (j + 1) % n_lon
+    last = len(vertices) - 1
+    i = np.arange(n_lat - 2)[:, None] * n_lon + 1
+    a, b, c, d = i + j, i + k, i + j + n_lon, i + k + n_lon
+    base = 1 + (n_lat - 2) * n_lon
+    faces = np.concatenate([
+        np.stack([np.zeros(n_lon, dtype=int), 1 + j, 1 + k], axis=-1),
+        np.stack([a, c, d], axis=-1).reshape(-1, 3),
+        np.stack([a, d, b], axis=-1).reshape(-1, 3),
+        np.stack([base + j, np.full(n_lon, last), base + k], axis=-1),
+    ])
+    return vertices, faces
+
+
+def _pixels(rng, frames, slices=24, layout=BOARD_8X10):
+    return rng.random((frames, slices, layout.rows, layout.cols)) < 0.3
+
+
+@benchmark("encode", [24, 1000, 10000])
+def _encode(frames, rng):
+    stack = _pixels(rng, frames)
+    return lambda: BOARD_8X10.encode(stack), frames
+
+
+@benchmark("encode_wide", [1, 8, 32])
+def _encode_wide(frames, rng):
+    layout = WideLayout("128x64", rows=64, cols=128, slices=128)
+    stack = rng.random((frames, layout.slices, layout.rows, layout.cols)) < 0.3
+    return lambda: layout.encode(stack), frames
+
+
+@benchmark("hub75_scan", [1, 8, 32])
+def _hub75_scan(frames, rng):
+    from .hub75 import PANEL_128X64
+    stack = rng.random((frames, PANEL_128X64.slices, PANEL_128X64.rows, PANEL_128X64.cols)) < 0.3
+    return lambda: PANEL_128X64.scan(stack), frames
+
+
+@benchmark("decode", [24, 1000, 10000])
+def _decode(frames, rng):
+    from .decode import decode_frames
+    words = BOARD_8X10.encode(_pixels(rng, frames))
+    return lambda: decode_frames(words, layout=BOARD_8X10), frames
+
+
+@benchmark("parse_header", [24, 1000, 10000])
+def _parse_header(frames, rng):
+    from .emit import write_header
+    from .formats import load_header
+    scratch = tempfile.TemporaryDirectory(prefix="kirmaadaa-bench-")
+    path = os.path.join(scratch.name, "framedata.h")
+    with open(path, "w") as f:
+        write_header(BOARD_8X10.encode(_pixels(rng, frames)), f)
+    return lambda: load_header(path), frames, scratch.cleanup
+
+
+@benchmark("diff", [24, 1000, 10000])
+def _diff(frames, rng):
+    from .diff import diff_words
+    stack = _pixels(rng, frames)
+    changed = stack ^ (rng.random(stack.shape) < 1e-3)
+    a, b = BOARD_8X10.encode(stack), BOARD_8X10.encode(changed)
+    return lambda: diff_words(a, b, BOARD_8X10).slice_counts(), frames
+
+
+@benchmark("convert_png", [1, 10, 100])
+def _convert_png(frames, rng):
+    from PIL import Image
+
+    from .convert import load_input
+    scratch = tempfile.TemporaryDirectory(prefix="kirmaadaa-bench-")
+    rgb = np.repeat(_pixels(rng, frames)[..., None] * np.uint8(255), 3, axis=-1)
+    for n, image in enumerate(rgb.reshape(-1, *rgb.shape[2:])):
+        Image.fromarray(image).save(os.path.join(scratch.name, f"frame_{n:05d}.png"))
+
+    def run():
+        _, words = load_input(scratch.name, BOARD_8X10, 24)
+        for _ in words:
+            pass
+    return run, frames, scratch.cleanup
+
+
+@benchmark("stream_header", [24, 1000, 10000])
+def _stream_header(frames, rng):
+    from .emit import write_header
+    from .formats import iter_header
+    scratch = tempfile.TemporaryDirectory(prefix="kirmaadaa-bench-")
+    path = os.path.join(scratch.name, "framedata.h")
+    with open(path, "w") as f:
+        write_header(BOARD_8X10.encode(_pixels(rng, frames)), f)
+
+    def run():
+        # The decode_render.py scripts parse this way, a batch of slices at a time
+        for _ in iter_header(path):
+            pass
+    return run, frames, scratch.cleanup
+
+
+@benchmark("emit_header", [24, 1000, 10000])
+def _emit_header(frames, rng):
+    from .emit import write_header
+    words = BOARD_8X10.encode(_pixels(rng, frames))
+    return lambda: write_header(words, io.StringIO()), frames
+
+
+@benchmark("emit_json", [24, 1000, 10000])
+def _emit_json(frames, rng):
+    from .emit import write_json
+    words = BOARD_8X10.encode(_pixels(rng, frames))
+    return lambda: write_json(words, io.StringIO(), rows=10, compact=True), frames
+
+
+@benchmark("patterns", [24, 1000, 10000])
+def _patterns(frames, rng):
+    from .patterns import generate, pattern_diagonal_wave
+    return lambda: generate(pattern_diagonal_wave, frames), frames
+
+
+class _FakePixels:
+    """Stand-in for bpy's Image.pixels, copying a float32 buffer like foreach_get does."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def foreach_get(self, out):
+        out[:] = self.data
+
+
+class _FakeImage:
+    def __init__(self, data, size):
+        self.size = size
+        self.pixels = _FakePixels(data)
+
+
+@benchmark("capture", [24, 1000, 10000])
+def _capture(frames, rng):
+    from .capture import FrameCapture
+    image = _FakeImage(rng.random(8 * 8 * 4, dtype=np.float32), (8, 8))
+    scratch = tempfile.TemporaryDirectory(prefix="kirmaadaa-bench-")
+    path = os.path.join(scratch.name, "frames.kcap")
+
+    def run():
+        with FrameCapture(path) as capture:
+            for frame in range(frames):
+                capture.capture(image, frame)
+        os.remove(path)
+    return run, frames, scratch.cleanup
+
+
+@benchmark("voxelize_grid", [32, 64, 128, 256], unit="voxels")
+def _voxelize_grid(n, rng):
+    from .voxelize import voxelize_grid
+    vertices, faces = uv_sphere()
+    vertices = vertices + rng.normal(scale=1e-3, size=vertices.shape)
+    axis = np.linspace(-1, 1, n)
+    return lambda: voxelize_grid(vertices, faces, axis, axis, axis), n ** 3
+
+
+@benchmark("voxelize_cylinder", [32, 64, 128], unit="voxels")
+def _voxelize_cylinder(n, rng):
+    from .voxelize import CylinderGrid, voxelize_cylinder
+    vertices, faces = uv_sphere()
+    vertices = vertices + rng.normal(scale=1e-3, size=vertices.shape)
+    grid = CylinderGrid(n, n, n, 1.0, -1.0, 1.0)
+    return lambda: voxelize_cylinder(vertices, faces, grid), n ** 3
+
+
+@benchmark("render_slices", [1, 2, 4], unit="frames")
+def _render_slices(supersample, rng):
+    from .render import render_slices
+    vertices, faces = uv_sphere()
+    return lambda: render_slices(vertices, faces, BOARD_WEDGE, 1.0, 2.0, supersample=supersample), 1
+
+
+def measure(run, repeat=5, budget=2.0):
+    """Time ``run`` after one warm-up call, up to ``repeat`` times or ``budget`` seconds."""
+    start = time.perf_counter()
+    run()
+    times = []
+    deadline = time.perf_counter() + budget
+    while len(times) < repeat and (not times or time.perf_counter() < deadline):
+        t = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - t)
+    if not times:
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_benchmarks(names=None, quick=False, repeat=5, budget=2.0, out=sys.stderr):
+    """Run the selected cases, returning {name: {scale: result}}."""
+    results = {}
+    for name, (scales, unit, setup) in BENCHMARKS.items():
+        if names and not any(n in name for n in names):
+            continue
+        for scale in scales[:2] if quick else scales:
+            run, items, *cleanup = setup(scale, np.random.default_rng(SEED))
+            try:
+                times = measure(run, repeat, budget)
+            finally:
+                for done in cleanup:
+                    done()
+            best = min(times)
+            results.setdefault(name, {})[str(scale)] = {
+                "min": best,
+                "median": statistics.median(times),
+                "runs": len(times),
+                "items": items,
+                "unit": unit,
+                "rate": items / best,
+            }
+            out.write(f"{name:18s} {scale:>6}  {best * 1e3:10.3f} ms  {items / best:14,.0f} {unit}/s\n")
+    return results
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(current, baseline, threshold=0.1):
+    """Return (name, scale, baseline s, current s, ratio, regressed) rows for cases in both runs."""
+    rows = []
+    for name, scales in current.items():
+        for scale, result in scales.items():
+            old = baseline.get(name, {}).get(scale)
+            if old:
+                ratio = result["min"] / old["min"]
+                rows.append((name, scale, old["min"], result["min"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main():
+    """Run the benchmarks, record them and report changes against the previous run."""
+    parser = argparse.ArgumentParser(description="Benchmark the framedata hot paths.")
+    parser.add_argument("--filter", nargs="+", metavar="NAME", help="Only run cases whose name contains one of these.")
+    parser.add_argument("--quick", action="store_true", help="Only the two smallest scales of each case.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case.")
+    parser.add_argument("--budget", type=float, default=2.0, help="Seconds of timed runs per case.")
+    parser.add_argument("--history", default="bench_history.json", help="JSON file the runs are appended to.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Slowdown counted as a regression.")
+    parser.add_argument("--fail", action="store_true", help="Exit with status 1 on a regression.")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit.")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (scales, unit, _) in BENCHMARKS.items():
+            print(f"{name:18s} {unit:7s} {', '.join(map(str, scales))}")
+        return
+
+    results = run_benchmarks(args.filter, args.quick, args.repeat, args.budget)
+    history = load_history(args.history)
+    run = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+
+    regressed = False
+    if history:
+        rows = compare(results, history[-1]["results"], args.threshold)
+        if rows:
+            print(f"\nAgainst {history[-1]['time']} ({history[-1].get('commit')}):", file=sys.stderr)
+        for name, scale, old, new, ratio, slower in rows:
+            flag = "  REGRESSION" if slower else ""
+            print(f"{name:18s} {scale:>6}  {old * 1e3:10.3f} -> {new * 1e3:10.3f} ms  {ratio:5.2f}x{flag}", file=sys.stderr)
+            regressed |= slower
+
+    history.append(run)
+    with open(args.history, "w") as f:
+        json.dump(history, f, indent=1)
+    if regressed and args.fail:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Adapters between Blender mesh data and the bpy-free tools.
+
+Only run inside Blender; nothing here imports bpy at module level.
+"""
+import numpy as np
+
+
+def mesh_arrays(obj, depsgraph=None):
+    """Return world-space (vertices, triangles) arrays of an object, read with foreach_get."""
+    if depsgraph is None:
+        import bpy
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+
+    evaluated = obj.evaluated_get(depsgraph)
+    mesh = evaluated.to_mesh()
+    try:
+        mesh.calc_loop_triangles()
+        vertices = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", vertices)
+        triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", triangles)
+    finally:
+        evaluated.to_mesh_clear()
+
+    matrix = np.array(obj.matrix_world, dtype=np.float64)
+    vertices = vertices.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+    return vertices, triangles.reshape(-1, 3)
+
+
+def animation_meshes(obj, frame_start=None, frame_end=None):
+    """Yield world-space (vertices, triangles) of an object for every frame of the scene's animation."""
+    import bpy
+    scene = bpy.context.scene
+    frame_start = scene.frame_start if frame_start is None else frame_start
+    frame_end = scene.frame_end if frame_end is None else frame_end
+
+    for frame in range(frame_start, frame_end + 1):
+        scene.frame_set(frame)
+        yield mesh_arrays(obj, bpy.context.evaluated_depsgraph_get())
+
+
+def mesh_object(name, vertices, faces, collection=None):
+    """Create and link a mesh object from (vertices, faces) arrays of equal sized polygons, with foreach_set."""
+    import bpy
+    faces = np.asarray(faces, dtype=np.int32)
+    corners = faces.shape[1]
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", np.asarray(vertices, dtype=np.float32).ravel())
+    mesh.loops.add(faces.size)
+    mesh.loops.foreach_set("vertex_index", faces.ravel())
+    mesh.polygons.add(len(faces))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, faces.size, corners, dtype=np.int32))
+    if bpy.app.version < (4, 0, 0):
+        # Polygon sizes follow from loop_start from 4.0 on, and loop_total is read-only
+        mesh.polygons.foreach_set("loop_total", np.full(len(faces), corners, dtype=np.int32))
+    mesh.update()
+    mesh.validate()
+
+    obj = bpy.data.objects.new(name, mesh)
+    (collection or bpy.context.scene.collection).objects.link(obj)
+    return obj
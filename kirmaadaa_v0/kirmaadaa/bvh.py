@@ -0,0 +1,232 @@
+import numpy as np
+
+LEAF_SIZE = 8
+
+
+def _dot(u, v):
+    return np.einsum("ij,ij->i", u, v)
+
+
+def _ragged_range(starts, counts):
+    """Concatenate arange(start, start + count) for every pair without a Python loop."""
+    offsets = np.cumsum(counts) - counts
+    return np.arange(counts.sum()) - np.repeat(offsets - starts, counts)
+
+
+def _first_per_group(group, key):
+    """Index of the smallest key within each group, one per distinct group."""
+    order = np.lexsort((key, group))
+    _, first = np.unique(group[order], return_index=True)
+    return order[first]
+
+
+def closest_point_on_triangles(p, a, b, c):
+    """Closest points on triangles (a, b, c) to points p, all shaped (n, 3)."""
+    ab, ac = b - a, c - a
+    ap, bp, cp = p - a, p - b, p - c
+    d1, d2 = _dot(ab, ap), _dot(ac, ap)
+    d3, d4 = _dot(ab, bp), _dot(ac, bp)
+    d5, d6 = _dot(ab, cp), _dot(ac, cp)
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denom = va + vb + vc
+        result = a + ab * (vb / denom)[:, None] + ac * (vc / denom)[:, None]
+
+        # Voronoi regions from Ericson, applied last-to-first so earlier tests win
+        bc = (va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0)
+        s = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        result = np.where(bc[:, None], b + (c - b) * s[:, None], result)
+        edge_ac = (vb <= 0) & (d2 >= 0) & (d6 <= 0)
+        result = np.where(edge_ac[:, None], a + ac * (d2 / (d2 - d6))[:, None], result)
+        result = np.where(((d6 >= 0) & (d5 <= d6))[:, None], c, result)
+        edge_ab = (vc <= 0) & (d1 >= 0) & (d3 <= 0)
+        result = np.where(edge_ab[:, None], a + ab * (d1 / (d1 - d3))[:, None], result)
+        result = np.where(((d3 >= 0) & (d4 <= d3))[:, None], b, result)
+        result = np.where(((d1 <= 0) & (d2 <= 0))[:, None], a, result)
+    return result
+
+
+class BVH:
+    """Bounding volume hierarchy over a triangle mesh, stored as flat node arrays.
+
+    Node i covers ``order[start[i]:start[i] + count[i]]`` and has children
+    ``left[i]`` / ``right[i]``, or -1 for leaves. Queries walk the tree for a
+    whole batch at once, keeping the (query, node) frontier in arrays.
+    """
+
+    def __init__(self, vertices, faces, leaf_size=LEAF_SIZE):
+        self.vertices = np.asarray(vertices, dtype=np.float64)
+        self.faces = np.asarray(faces, dtype=np.intp).reshape(-1, 3)
+        tri = self.vertices[self.faces]
+        self.a, self.b, self.c = tri[:, 0], tri[:, 1], tri[:, 2]
+        self._build(tri.min(axis=1), tri.max(axis=1), tri.mean(axis=1), leaf_size)
+
+    def _build(self, tri_lo, tri_hi, centroids, leaf_size):
+        self.order = np.arange(len(self.faces))
+        lo, hi, left, right, start, count = [], [], [], [], [], []
+
+        def add_node(s, e):
+            idx = self.order[s:e]
+            lo.append(tri_lo[idx].min(axis=0) if e > s else np.zeros(3))
+            hi.append(tri_hi[idx].max(axis=0) if e > s else np.zeros(3))
+            left.append(-1)
+            right.append(-1)
+            start.append(s)
+            count.append(e - s)
+            return len(lo) - 1
+
+        stack = [add_node(0, len(self.order))]
+        while stack:
+            node = stack.pop()
+            s, n = start[node], count[node]
+            if n <= leaf_size:
+                continue
+
+            # Median split on the widest axis of the triangle centroids
+            idx = self.order[s:s + n]
+            axis = np.argmax(np.ptp(centroids[idx], axis=0))
+            mid = n // 2
+            self.order[s:s + n] = idx[np.argpartition(centroids[idx, axis], mid)]
+            left[node] = add_node(s, s + mid)
+            right[node] = add_node(s + mid, s + n)
+            stack += [left[node], right[node]]
+
+        self.lo, self.hi = np.array(lo), np.array(hi)
+        self.left, self.right = np.array(left), np.array(right)
+        self.start, self.count = np.array(start), np.array(count)
+
+    def _leaf_triangles(self, query, nodes):
+        """Expand (query, leaf) pairs into (query, triangle) pairs."""
+        counts = self.count[nodes]
+        return np.repeat(query, counts), self.order[_ragged_range(self.start[nodes], counts)]
+
+    def _slab(self, origins, directions, nodes, t_min, t_max):
+        """Vectorized ray/box slab test for (ray, node) pairs."""
+        lo, hi = self.lo[nodes], self.hi[nodes]
+        parallel = directions == 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t1 = (lo - origins) / directions
+            t2 = (hi - origins) / directions
+        inside = (origins >= lo) & (origins <= hi)
+        near = np.where(parallel, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2))
+        far = np.where(parallel, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2))
+        entry, exit = near.max(axis=1), far.min(axis=1)
+        return (entry <= exit) & (exit >= t_min) & (entry <= t_max)
+
+    def candidates(self, origins, directions, t_min=0.0, t_max=np.inf):
+        """(ray, triangle) pairs whose leaf boxes each ray passes through between t_min and t_max."""
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.broadcast_to(np.asarray(directions, dtype=np.float64), origins.shape)
+        rays = np.arange(len(origins))
+        nodes = np.zeros(len(origins), dtype=np.intp)
+        leaf_rays, leaf_nodes = [], []
+        if len(self.faces) == 0:
+            rays = rays[:0]
+
+        while len(rays):
+            hit = self._slab(origins[rays], directions[rays], nodes, t_min, t_max)
+            rays, nodes = rays[hit], nodes[hit]
+            leaf = self.left[nodes] < 0
+            leaf_rays.append(rays[leaf])
+            leaf_nodes.append(nodes[leaf])
+            inner = ~leaf
+            rays = np.concatenate([rays[inner], rays[inner]])
+            nodes = np.concatenate([self.left[nodes[inner]], self.right[nodes[inner]]])
+
+        if not leaf_rays:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        return self._leaf_triangles(np.concatenate(leaf_rays), np.concatenate(leaf_nodes))
+
+    def intersect(self, origins, directions, t_min=0.0, t_max=np.inf):
+        """Every ray/triangle hit as (ray, t, triangle) arrays, using Moller-Trumbore."""
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.broadcast_to(np.asarray(directions, dtype=np.float64), origins.shape)
+        ray, tri = self.candidates(origins, directions, t_min, t_max)
+        o, d = origins[ray], directions[ray]
+        a = self.a[tri]
+        e1, e2 = self.b[tri] - a, self.c[tri] - a
+
+        pvec = np.cross(d, e2)
+        det = _dot(e1, pvec)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inv = 1.0 / det
+            tvec = o - a
+            u = _dot(tvec, pvec) * inv
+            qvec = np.cross(tvec, e1)
+            v = _dot(d, qvec) * inv
+            t = _dot(e2, qvec) * inv
+        hit = (det != 0) & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= t_min) & (t <= t_max)
+        return ray[hit], t[hit], tri[hit]
+
+    def ray_cast(self, origins, directions, t_max=np.inf):
+        """Nearest hit per ray as (hit, t, triangle, location); misses have t inf and triangle -1."""
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.broadcast_to(np.asarray(directions, dtype=np.float64), origins.shape)
+        ray, t, tri = self.intersect(origins, directions, 0.0, t_max)
+
+        best_t = np.full(len(origins), np.inf)
+        best_tri = np.full(len(origins), -1)
+        first = _first_per_group(ray, t)
+        best_t[ray[first]] = t[first]
+        best_tri[ray[first]] = tri[first]
+        hit = best_tri >= 0
+        location = origins + directions * np.where(hit, best_t, 0)[:, None]
+        return hit, best_t, best_tri, location
+
+    def _box_distance2(self, points, nodes):
+        gap = np.maximum(self.lo[nodes] - points, 0) + np.maximum(points - self.hi[nodes], 0)
+        return _dot(gap, gap)
+
+    def _nearest_in_leaves(self, points, query, nodes, best_d2, best_tri, best_loc):
+        """Test every triangle of the given leaves and keep per-point improvements."""
+        query, tri = self._leaf_triangles(query, nodes)
+        if not len(query):
+            return
+        loc = closest_point_on_triangles(points[query], self.a[tri], self.b[tri], self.c[tri])
+        diff = loc - points[query]
+        d2 = _dot(diff, diff)
+        first = _first_per_group(query, d2)
+        q = query[first]
+        better = d2[first] < best_d2[q]
+        q, first = q[better], first[better]
+        best_d2[q] = d2[first]
+        best_tri[q] = tri[first]
+        best_loc[q] = loc[first]
+
+    def closest_point(self, points):
+        """Closest surface point per query as (location, distance, triangle)."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        n = len(points)
+        best_d2 = np.full(n, np.inf)
+        best_tri = np.full(n, -1)
+        best_loc = np.full((n, 3), np.nan)
+        if len(self.faces) == 0:
+            return best_loc, np.sqrt(best_d2), best_tri
+
+        # Greedy descent to the nearest-looking leaf gives every point a first bound
+        query = np.arange(n)
+        nodes = np.zeros(n, dtype=np.intp)
+        while True:
+            inner = self.left[nodes] >= 0
+            if not inner.any():
+                break
+            l, r = self.left[nodes[inner]], self.right[nodes[inner]]
+            go_left = self._box_distance2(points[inner], l) <= self._box_distance2(points[inner], r)
+            nodes[inner] = np.where(go_left, l, r)
+        self._nearest_in_leaves(points, query, nodes, best_d2, best_tri, best_loc)
+
+        # Then walk the whole tree, pruning boxes farther than the current best
+        nodes = np.zeros(n, dtype=np.intp)
+        while len(query):
+            near = self._box_distance2(points[query], nodes) < best_d2[query]
+            query, nodes = query[near], nodes[near]
+            leaf = self.left[nodes] < 0
+            self._nearest_in_leaves(points, query[leaf], nodes[leaf], best_d2, best_tri, best_loc)
+            inner = ~leaf
+            query = np.concatenate([query[inner], query[inner]])
+            nodes = np.concatenate([self.left[nodes[inner]], self.right[nodes[inner]]])
+
+        return best_loc, np.sqrt(best_d2), best_tri
@@ -0,0 +1,110 @@
+"""Append-only capture of thresholded render frames, bpy-free so it runs on fake images too.
+
+File layout (little endian):
+    4s magic "KCAP", u16 version, u16 width, u16 height, u16 reserved,
+    then one record per frame: i32 scene frame number, width * height uint8 pixels (0 or 1).
+
+Records are flushed as they are captured, so a crashed render loses at most
+the frame in progress, and reopening the file resumes after the last
+complete record.
+"""
+import os
+import struct
+
+import numpy as np
+
+from .instrument import stage
+
+MAGIC = b"KCAP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHH")
+
+
+def record_dtype(width, height):
+    return np.dtype([("frame", "<i4"), ("pixels", "u1", (height, width))])
+
+
+class FrameCapture:
+    """Threshold render results into preallocated buffers and append them to a capture file.
+
+    ``image`` only needs ``size`` and a ``pixels`` sequence with
+    ``foreach_get``, as ``bpy.types.Image`` has.
+    """
+
+    def __init__(self, path, width=8, height=8, level=0.5):
+        self.path = path
+        self.width, self.height = width, height
+        self.dtype = record_dtype(width, height)
+        self.rgba = np.empty(width * height * 4, dtype=np.float32)
+        self.gray = np.empty((height, width), dtype=np.float32)
+        self.record = np.zeros(1, dtype=self.dtype)
+        # Mean of RGB above level, without dividing every pixel by three
+        self.level = 3 * level
+        self.last_frame = None
+        self.count = 0
+        self.file = self._open()
+
+    def _open(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER.size:
+            f = open(self.path, "wb")
+            f.write(HEADER.pack(MAGIC, VERSION, self.width, self.height, 0))
+            f.flush()
+            return f
+
+        f = open(self.path, "r+b")
+        magic, version, width, height, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or (width, height) != (self.width, self.height):
+            f.close()
+            raise ValueError(f"'{self.path}' is not a {self.width}x{self.height} capture file")
+
+        # Drop a record cut short by a crash and continue after the last whole one
+        self.count = (os.path.getsize(self.path) - HEADER.size) // self.dtype.itemsize
+        f.truncate(HEADER.size + self.count * self.dtype.itemsize)
+        if self.count:
+            f.seek(HEADER.size + (self.count - 1) * self.dtype.itemsize)
+            self.last_frame = int(np.frombuffer(f.read(self.dtype.itemsize), dtype=self.dtype)["frame"][0])
+        f.seek(0, os.SEEK_END)
+        return f
+
+    def capture(self, image, frame):
+        """Threshold one render result and append it as scene frame ``frame``."""
+        width, height = image.size
+        if (width, height) != (self.width, self.height):
+            raise ValueError(f"Rendered frame is not {self.width}x{self.height} pixels (found {width}x{height})")
+
+        with stage("capture", items=1, nbytes=self.dtype.itemsize):
+            image.pixels.foreach_get(self.rgba)
+            rgba = self.rgba.reshape(height, width, 4)
+            np.add(rgba[:, :, 0], rgba[:, :, 1], out=self.gray)
+            self.gray += rgba[:, :, 2]
+            np.greater(self.gray, self.level, out=self.record["pixels"][0], casting="unsafe")
+            self.record["frame"] = frame
+
+            self.file.write(self.record.tobytes())
+            self.file.flush()
+        self.last_frame = frame
+        self.count += 1
+        return self.record["pixels"][0]
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_capture(path):
+    """Read a capture file as (frame numbers, (n, height, width) uint8 frames), ignoring a partial record."""
+    with open(path, "rb") as f:
+        magic, version, width, height, _ = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"'{path}' is not a capture file")
+    dtype = record_dtype(width, height)
+    count = (os.path.getsize(path) - HEADER.size) // dtype.itemsize
+    if count == 0:
+        return np.empty(0, dtype="<i4"), np.empty((0, height, width), dtype=np.uint8)
+    records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER.size, shape=(count,))
+    return records["frame"], records["pixels"]
@@ -0,0 +1,87 @@
+"""Binary framedata container.
+
+Layout, all little endian:
+
+    magic "KFDA", u16 version, u16 header size,
+    u32 frames, u32 slices, u32 columns, u32 rows, u32 base word,
+    one byte per row with its bit position, zero padded to 4 bytes,
+    then frames * slices * columns raw uint32 words.
+
+The word block starts 4-byte aligned so it can be memory-mapped directly.
+"""
+import struct
+
+import numpy as np
+
+from .emit import frame_stream
+from .layout import BOARD_8X10
+
+MAGIC = b"KFDA"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIIII")
+
+
+def write_framedata(out, words, rows, layout=BOARD_8X10, frames=None):
+    """Write frames of column words to a path or binary file object, one frame at a time.
+
+    ``words`` may be a (frames, slices, cols) array or an iterable of (slices, cols)
+    frames, in which case pass ``frames`` if it has no length.
+    """
+    if isinstance(out, (str, bytes)) or hasattr(out, "__fspath__"):
+        with open(out, "wb") as f:
+            return write_framedata(f, words, rows, layout, frames)
+
+    frames, slices, cols, stream = frame_stream(words, frames)
+    pins = bytes(layout.row_bits[:rows])
+    pins += bytes(-len(pins) % 4)
+    header_size = HEADER.size + len(pins)
+
+    out.write(HEADER.pack(MAGIC, VERSION, header_size, frames, slices, cols, rows, layout.base_word))
+    out.write(pins)
+    for frame in stream:
+        out.write(np.ascontiguousarray(frame, dtype="<u4").tobytes())
+    out.flush()
+
+
+def read_header(f):
+    """Read the container header from a binary file object."""
+    raw = f.read(HEADER.size)
+    if len(raw) < HEADER.size:
+        raise ValueError("File too short for a framedata header")
+    magic, version, header_size, frames, slices, cols, rows, base_word = HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError(f"Not a framedata container (magic {magic!r})")
+    if version != VERSION:
+        raise ValueError(f"Unsupported framedata container version {version}")
+    row_bits = list(f.read(header_size - HEADER.size)[:rows])
+
+    return {
+        "resolution": {
+            "frames": frames,
+            "slices": slices,
+            "columns": cols,
+            "rows": rows
+        },
+        "layout": {
+            "base_word": base_word,
+            "row_bits": row_bits
+        },
+        "offset": header_size
+    }
+
+
+def read_framedata(path):
+    """Memory-map a container and return (header, words) without parsing the payload.
+
+    ``words`` is a read-only (frames, slices, cols) uint32 view of the file, so
+    indexing a frame or slice touches only those pages.
+    """
+    with open(path, "rb") as f:
+        header = read_header(f)
+    res = header["resolution"]
+    shape = (res["frames"], res["slices"], res["columns"])
+    if 0 in shape:
+        return header, np.empty(shape, dtype="<u4")
+    words = np.memmap(path, dtype="<u4", mode="r", offset=header["offset"], shape=shape)
+    return header, words
+
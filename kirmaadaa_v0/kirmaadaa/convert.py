@@ -0,0 +1,63 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from .container import write_framedata
+from .emit import write_header, write_json
+from .encode import group_slices, load_sprite_sheet
+from .instrument import add_arguments, configure, count, counted, log, timed
+from .layout import BOARDS
+from .palette import deduplicate, palette_stats, write_palette_header
+from .parallel import encode_directory
+
+
+def load_input(path, layout, slices, jobs=1):
+    """Encode a directory of PNG slices or a sprite sheet, returning (frames, frame iterable)."""
+    if os.path.isdir(path):
+        files = sorted(os.path.join(path, f) for f in os.listdir(path))
+        return len(files) // slices, encode_directory(files, layout, slices, jobs)
+    words = layout.encode(group_slices(load_sprite_sheet(path, layout.rows, layout.cols), slices))
+    return len(words), words
+
+
+def write_output(words, frames, slices, layout, output_format="header", compact=False):
+    """Write encoded frames to stdout as a C header, JSON, a binary container or a palette header."""
+    count("frames", frames)
+    words = timed("produce", words)
+    out = counted(sys.stdout)
+    if output_format == "palette":
+        # Deduplicating needs every slice, so the frames are collected first
+        words = np.array(list(words), dtype=np.uint32).reshape(frames, slices, layout.cols)
+        palette, indices = deduplicate(words)
+        write_palette_header(palette, indices, out)
+        stats = palette_stats(words, palette, indices)
+        log(f"{stats['unique_slices']} unique of {stats['slices']} slices, "
+            f"{stats['raw_bytes']} -> {stats['packed_bytes']} bytes ({stats['ratio']:.1f}x)")
+    elif output_format == "binary":
+        write_framedata(counted(sys.stdout.buffer), words, layout.rows, layout, frames)
+    elif output_format == "json":
+        write_json(words, out, rows=layout.rows, frames=frames, compact=compact)
+    else:
+        write_header(words, out, frames=frames)
+
+
+def main(board="8x8", output_format="header"):
+    """Command line entry point shared by the per-model convert.py scripts."""
+    parser = argparse.ArgumentParser(description="Convert rendered slices into framedata.")
+    parser.add_argument("input", help="Directory of PNG slices or a sprite sheet PNG.")
+    parser.add_argument("--board", choices=sorted(BOARDS), default=board, help="LED board pin layout.")
+    parser.add_argument("--slices", type=int, help="Slices per frame, defaults to the board's.")
+    parser.add_argument("--format", choices=("header", "json", "binary", "palette"), default=output_format, help="Output format.")
+    parser.add_argument("--compact", action="store_true", help="Write JSON without indentation.")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Worker processes, 0 for one per core.")
+    add_arguments(parser)
+    args = parser.parse_args()
+    configure(args)
+
+    layout = BOARDS[args.board]
+    slices = args.slices or layout.slices
+    frames, words = load_input(args.input, layout, slices, args.jobs)
+
+    write_output(words, frames, slices, layout, args.format, args.compact)
@@ -0,0 +1,35 @@
+import re
+
+import numpy as np
+
+from .layout import BOARD_8X10
+
+HEX_WORD = re.compile(r"0x([0-9A-Fa-f]+)")
+
+
+def parse_words(slice_strs):
+    """Parse C initializer strings like "0x0401E701, ..." into an (n, cols) uint32 array."""
+    rows = [HEX_WORD.findall(s) for s in slice_strs]
+    flat = np.fromiter((int(h, 16) for row in rows for h in row), dtype=np.uint32)
+    return flat.reshape(len(rows), -1)
+
+
+def decode_frames(words, rows=10, out=None, layout=BOARD_8X10):
+    """Decode (..., cols) column words into (..., rows, cols) uint8 row bits.
+
+    Values are the raw row bits, so like the firmware a 0 means the LED is on.
+    Pass a preallocated uint8 ``out`` array to decode without allocating.
+    """
+    return layout.decode(words, rows, out)
+
+
+def decode_pixels(words, rows=10, layout=BOARD_8X10):
+    """Decode column words into a (..., rows, cols) boolean lit-pixel array, the inverse of encode_frames."""
+    bits = layout.decode(words, rows)
+    np.logical_not(bits, out=bits)
+    return bits.view(bool)
+
+
+def as_bool(bits):
+    """Zero-copy boolean view of a uint8 array returned by decode_frames."""
+    return bits.view(bool)
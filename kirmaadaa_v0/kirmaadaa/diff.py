@@ -0,0 +1,155 @@
+import argparse
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from . import instrument
+from .formats import load_framedata
+from .layout import BOARDS
+
+
+class WordDiff(namedtuple("WordDiff", "shape_a shape_b shape index leds other")):
+    """Words that differ between two framedata sets, compared over their common (frames, slices, cols) shape.
+
+    ``index`` holds the flat positions of the differing words in that shape,
+    ``leds`` the (n, rows) differing row bits of each and ``other`` the
+    differing bits outside the row pins, e.g. a changed column select.
+    """
+
+    @property
+    def frame(self):
+        return self.index // (self.shape[1] * self.shape[2])
+
+    @property
+    def slice(self):
+        return self.index // self.shape[2] % self.shape[1]
+
+    @property
+    def col(self):
+        return self.index % self.shape[2]
+
+    @property
+    def identical(self):
+        return self.shape_a == self.shape_b and not len(self.index)
+
+    @property
+    def led_count(self):
+        return int(self.leds.sum())
+
+    def frame_counts(self):
+        """Differing LEDs per frame."""
+        return np.bincount(self.frame, self.leds.sum(axis=1), minlength=self.shape[0]).astype(np.int64)
+
+    def slice_counts(self):
+        """Differing LEDs per (frame, slice)."""
+        counts = np.bincount(self.index // self.shape[2], self.leds.sum(axis=1), minlength=self.shape[0] * self.shape[1])
+        return counts.astype(np.int64).reshape(self.shape[:2])
+
+    def led_counts(self):
+        """How often each (row, col) LED differs, over all frames and slices."""
+        counts = np.zeros((self.leds.shape[1], self.shape[2]), dtype=np.int64)
+        np.add.at(counts.T, self.col, self.leds)
+        return counts
+
+
+def diff_words(a, b, layout, rows=None):
+    """XOR two (frames, slices, cols) word arrays and decode the differing words into LEDs."""
+    rows = layout.rows if rows is None else rows
+    shape = tuple(min(x, y) for x, y in zip(a.shape, b.shape))
+    frames, slices, cols = shape
+    with instrument.stage("xor", items=frames) as s:
+        xor = a[:frames, :slices, :cols] ^ b[:frames, :slices, :cols]
+        s.bytes = xor.nbytes
+    flat = xor.reshape(-1)
+    index = np.flatnonzero(flat)
+    changed = flat[index]
+    # Only the differing words are decoded; a set bit in the XOR is a flipped pin
+    with instrument.stage("decode", items=len(index)):
+        leds = layout.decode(changed[:, None], rows)[..., 0].astype(bool)
+    row_mask = np.bitwise_or.reduce(np.uint32(1) << np.array(layout.row_bits[:rows], dtype=np.uint32))
+    return WordDiff(a.shape, b.shape, shape, index, leds, changed & ~row_mask)
+
+
+def heatmap(diff, scale=8):
+    """Render the differing LEDs per (frame, slice) as an RGB image, black through red to yellow."""
+    counts = diff.slice_counts().astype(np.float32)
+    level = counts / (counts.max() or 1.0)
+    rgb = np.stack([np.minimum(level * 2, 1), np.clip(level * 2 - 1, 0, 1), np.zeros_like(level)], axis=-1)
+    image = (rgb * 255).astype(np.uint8)
+    return image.repeat(scale, axis=0).repeat(scale, axis=1)
+
+
+def report(diff, name_a, name_b, limit=10, out=sys.stdout):
+    """Print what differs: the shapes, counts per frame and slice and how often each LED differs."""
+    if diff.identical:
+        print(f"{name_a} and {name_b} are identical ({diff.shape[0]} frame(s))", file=out)
+        return
+    print(f"{name_a} vs {name_b}", file=out)
+    if diff.shape_a != diff.shape_b:
+        print(f"  shape {diff.shape_a} vs {diff.shape_b}, compared over {diff.shape}", file=out)
+    frames, slices, cols = diff.shape
+    slice_counts = diff.slice_counts()
+    frame_counts = slice_counts.sum(axis=1)
+    changed_frames = np.flatnonzero(frame_counts)
+    print(f"  {diff.led_count} LED(s) differ in {len(diff.index)} of {frames * slices * cols} word(s), "
+          f"{np.count_nonzero(slice_counts)} slice(s) of {len(changed_frames)}/{frames} frame(s)", file=out)
+    if other := np.count_nonzero(diff.other):
+        print(f"  {other} word(s) differ outside the row pins", file=out)
+
+    for frame in changed_frames[np.argsort(-frame_counts[changed_frames], kind="stable")][:limit]:
+        changed_slices = np.flatnonzero(slice_counts[frame])
+        listed = ", ".join(f"{s}:{slice_counts[frame, s]}" for s in changed_slices[:limit])
+        more = " ..." if len(changed_slices) > limit else ""
+        print(f"  frame {frame}: {frame_counts[frame]} LED(s) in slice(s) {listed}{more}", file=out)
+    if len(changed_frames) > limit:
+        print(f"  ... {len(changed_frames) - limit} more frame(s)", file=out)
+
+    print("  differing LEDs by row and column, over all slices:", file=out)
+    counts = diff.led_counts()
+    width = len(str(counts.max()))
+    for row in counts:
+        print("    " + " ".join(f"{n:{width}d}" for n in row), file=out)
+
+
+def main():
+    """Compare framedata files against a reference and exit with status 1 if any differ."""
+    parser = argparse.ArgumentParser(description="Bit-level diff of framedata files (.kfd, .json, C header or decoded matrices).")
+    parser.add_argument("reference", help="Framedata to compare against.")
+    parser.add_argument("others", nargs="+", help="Framedata compared with the reference.")
+    parser.add_argument("--board", choices=sorted(BOARDS), default="8x10", help="LED board pin layout, for inputs that do not record it.")
+    parser.add_argument("--rows", type=int, help="LED rows, for inputs that do not record them.")
+    parser.add_argument("--limit", type=int, default=10, help="Frames and slices listed per comparison.")
+    parser.add_argument("--heatmap", metavar="PNG", help="Save a frame by slice heatmap of the differences; "
+                                                         "numbered when there are several files.")
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.configure(args)
+
+    board = BOARDS[args.board]
+    with instrument.stage("load"):
+        reference, rows, layout = load_framedata(args.reference, args.rows or board.rows, board)
+    differ = False
+    for n, path in enumerate(args.others):
+        with instrument.stage("load"):
+            words, other_rows, other = load_framedata(path, args.rows or board.rows, board)
+        if other.row_bits[:other_rows] != layout.row_bits[:other_rows]:
+            instrument.log(f"Warning: '{path}' uses other row pins than the reference; decoding with the reference's")
+        diff = diff_words(reference, words, layout, min(rows, other_rows, layout.rows))
+        differ |= not diff.identical
+        if instrument.VERBOSITY:
+            report(diff, args.reference, path, args.limit)
+
+        if args.heatmap and not diff.identical:
+            from PIL import Image
+
+            root, ext = os.path.splitext(args.heatmap)
+            target = args.heatmap if len(args.others) == 1 else f"{root}_{n + 1}{ext}"
+            Image.fromarray(heatmap(diff)).save(target)
+            instrument.log(f"Heatmap saved to '{target}'")
+    sys.exit(1 if differ else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import itertools
+import json
+import sys
+
+
+def frame_stream(words, frames=None):
+    """Return (frames, slices, cols, iterator) for a word array or an iterable of (slices, cols) frames.
+
+    Pass ``frames`` when ``words`` is a generator without a length.
+    """
+    if frames is None:
+        frames = len(words)
+    iterator = iter(words)
+    first = next(iterator, None)
+    if first is None:
+        shape = getattr(words, "shape", (0, 0, 0))
+        return frames, shape[1], shape[2], iter(())
+    slices, cols = first.shape
+    return frames, slices, cols, itertools.chain([first], iterator)
+
+
+def write_header(words, out=sys.stdout, frames=None):
+    """Write frames of column words as a C framedata declaration, one frame at a time."""
+    frames, slices, cols, stream = frame_stream(words, frames)
+    out.write(f"const uint32_t framedata[{frames}][{slices}][{cols}]= {{\n")
+    for n, frame in enumerate(stream):
+        out.write(" },{\n" if n > 0 else " {\n")
+        for slice_words in frame:
+            out.write("  {" + ", ".join(f"0x{int(w):08X}" for w in slice_words) + "  },\n")
+    out.write(" }\n};\n")
+    out.flush()
+
+
+class JsonWriter:
+    """Incremental writer for the simulator's {"resolution": ..., "data": [...]} document.
+
+    Frames are written as they are encoded and only one frame is held at a
+    time. When the frame count is known up front the resolution block comes
+    first, so a reader can start on the data straight away; otherwise it is
+    written after the data, once the count is known. ``compact`` drops all
+    indentation.
+    """
+
+    def __init__(self, out=sys.stdout, rows=8, frames=None, compact=False):
+        self.out = out
+        self.rows = rows
+        self.frames = frames
+        self.compact = compact
+        self.written = 0
+        self.slices = 0
+        self.cols = 0
+
+    def _dumps(self, value):
+        if self.compact:
+            return json.dumps(value, separators=(",", ":"))
+        return json.dumps(value, indent=4)
+
+    def _resolution(self):
+        return {
+            "frames": self.written if self.frames is None else self.frames,
+            "slices": self.slices,
+            "columns": self.cols,
+            "rows": self.rows
+        }
+
+    def _open(self):
+        if self.frames is None:
+            self.out.write('{"data":[' if self.compact else '{\n    "data": [\n')
+        else:
+            head = self._dumps({"resolution": self._resolution(), "data": []})
+            self.out.write(head[:head.rindex("[]") + 1] + ("" if self.compact else "\n"))
+
+    def write_frame(self, frame):
+        """Append one (slices, cols) frame of column words."""
+        if self.written == 0:
+            self.slices, self.cols = frame.shape
+            self._open()
+        elif self.compact:
+            self.out.write(",")
+        else:
+            self.out.write(",\n")
+
+        text = self._dumps([[f"{int(w):08X}" for w in slice_words] for slice_words in frame])
+        if not self.compact:
+            text = "\n".join("        " + line for line in text.split("\n"))
+        self.out.write(text)
+        self.written += 1
+
+    def close(self):
+        """Finish the document."""
+        if self.written == 0:
+            self.out.write(self._dumps({"resolution": self._resolution(), "data": []}) + "\n")
+        elif self.frames is None:
+            resolution = self._dumps(self._resolution())
+            if self.compact:
+                self.out.write(f'],"resolution":{resolution}}}\n')
+            else:
+                resolution = resolution.replace("\n", "\n    ")
+                self.out.write(f'\n    ],\n    "resolution": {resolution}\n}}\n')
+        else:
+            self.out.write("]}\n" if self.compact else "\n    ]\n}\n")
+        self.out.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_json(words, out=sys.stdout, rows=8, frames=None, compact=False):
+    """Write frames of column words as the simulator's framedata JSON, one frame at a time."""
+    frames, slices, cols, stream = frame_stream(words, frames)
+    writer = JsonWriter(out, rows, frames, compact)
+    writer.slices, writer.cols = slices, cols
+    for frame in stream:
+        writer.write_frame(frame)
+    writer.close()
@@ -0,0 +1,52 @@
+import numpy as np
+
+from .instrument import stage
+from .layout import BOARD_8X10
+
+# Red channel value above which a rendered pixel counts as lit
+THRESHOLD = 2
+
+
+def load_red(path):
+    """Load the red channel of a PNG as a (rows, cols) uint8 array."""
+    # Imported here so the package loads in Blender's Python, which has no Pillow
+    from PIL import Image
+
+    with stage("load", items=1) as s, Image.open(path) as im:
+        red = np.asarray(im.convert("RGB"))[:, :, 0]
+        s.bytes = red.nbytes
+    return red
+
+
+def load_image(path, threshold=THRESHOLD):
+    """Load a PNG as a (rows, cols) boolean array."""
+    red = load_red(path)
+    with stage("binarize", items=1):
+        return red > threshold
+
+
+def load_images(paths, threshold=THRESHOLD):
+    """Load equally sized PNGs into a (n, rows, cols) boolean stack."""
+    return np.stack([load_image(path, threshold) for path in paths])
+
+
+def load_sprite_sheet(path, rows, cols, threshold=THRESHOLD):
+    """Split a sprite sheet into (n, rows, cols) tiles, left to right then top to bottom."""
+    sheet = load_image(path, threshold)
+    height, width = sheet.shape
+    if height % rows or width % cols:
+        raise ValueError(f"Sprite sheet {width}x{height} is not a grid of {cols}x{rows} tiles")
+
+    tiles = sheet.reshape(height // rows, rows, width // cols, cols).swapaxes(1, 2)
+    return tiles.reshape(-1, rows, cols)
+
+
+def group_slices(stack, slices):
+    """Reshape a (n, rows, cols) stack into (frames, slices, rows, cols), dropping a partial last frame."""
+    frames = len(stack) // slices
+    return stack[:frames * slices].reshape(frames, slices, *stack.shape[1:])
+
+
+def encode_frames(stack, layout=BOARD_8X10):
+    """Encode a (..., rows, cols) pixel stack into (..., cols) uint32 column words."""
+    return layout.encode(stack)
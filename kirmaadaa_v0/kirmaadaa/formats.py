@@ -0,0 +1,146 @@
+import codecs
+import json
+import mmap
+import os
+import re
+
+import numpy as np
+
+from .container import MAGIC, read_framedata
+from .layout import BOARD_8X10, Layout
+
+DECLARATION = re.compile(rb"framedata\s*\[\s*(\d+)\s*\]\s*\[\s*(\d+)\s*\]\s*\[\s*(\d+)\s*\]")
+SLICE = re.compile(rb"{\s*([0x0-9A-Fa-f, ]+)\s*}")
+HEX_WORD = re.compile(rb"0x([0-9A-Fa-f]+)")
+MATRIX_SLICE = re.compile(rb"\[Slice \d+\]")
+
+BOMS = ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+
+# Value of every ASCII hex digit, for converting tokens in bulk
+HEX_VALUES = np.zeros(256, dtype=np.uint32)
+HEX_VALUES[np.frombuffer(b"0123456789", dtype=np.uint8)] = np.arange(10)
+HEX_VALUES[np.frombuffer(b"abcdef", dtype=np.uint8)] = np.arange(10, 16)
+HEX_VALUES[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16)
+NIBBLE_WEIGHTS = np.uint32(16) ** np.arange(7, -1, -1, dtype=np.uint32)
+
+
+def text_encoding(path):
+    """Encoding of a text file from its byte order mark, UTF-8 without one."""
+    with open(path, "rb") as f:
+        head = f.read(4)
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+    return "utf-8"
+
+
+def _ascii_chunks(path, chunk_size):
+    """Yield a text file as ASCII byte chunks, memory mapped for UTF-8 and decoded incrementally for UTF-16."""
+    encoding = text_encoding(path)
+    with open(path, "rb") as f:
+        if encoding == "utf-16":
+            decoder = codecs.getincrementaldecoder(encoding)()
+            while chunk := f.read(chunk_size):
+                yield decoder.decode(chunk).encode("ascii", "replace")
+            return
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for start in range(0, len(mm), chunk_size):
+                yield mm[start:start + chunk_size]
+
+
+def _hex_words(tokens):
+    """Convert hex digit tokens of up to 8 digits into a uint32 array."""
+    tokens = [t if len(t) == 8 else t.rjust(8, b"0") for t in tokens]
+    digits = np.frombuffer(b"".join(tokens), dtype=np.uint8).reshape(-1, 8)
+    return HEX_VALUES[digits] @ NIBBLE_WEIGHTS
+
+
+def iter_header(path, chunk_size=1 << 18):
+    """Stream a C framedata header in one pass as ((frames, slices, cols) or None, (n, cols) uint32) batches.
+
+    The file is read ``chunk_size`` bytes at a time, as UTF-8 or as UTF-16
+    with a BOM, and the complete slices of each chunk are parsed together,
+    so memory is bounded by the chunk size however long the header is. The
+    dimensions come from the framedata[F][S][C] declaration and are None
+    when there is none.
+    """
+    shape = None
+    tail = b""
+    for chunk in _ascii_chunks(path, chunk_size):
+        text = tail + chunk
+        # Parse up to the last closing brace; a slice cut by the chunk edge waits for the next chunk
+        end = text.rfind(b"}") + 1
+        text, tail = text[:end], text[end:]
+        if shape is None:
+            match = DECLARATION.search(text)
+            if match:
+                shape = tuple(map(int, match.groups()))
+        groups = SLICE.findall(text)
+        if not groups:
+            continue
+        tokens = HEX_WORD.findall(b",".join(groups))
+        cols = len(tokens) // len(groups)
+        if cols * len(groups) != len(tokens):
+            raise ValueError(f"Slices in '{path}' have differing column counts")
+        yield shape, _hex_words(tokens).reshape(len(groups), cols)
+
+
+def load_header(path):
+    """Load a C framedata header into a (frames, slices, cols) uint32 array."""
+    shape = None
+    batches = []
+    for shape, words in iter_header(path):
+        batches.append(words)
+    words = np.concatenate(batches) if batches else np.empty((0, 0), dtype=np.uint32)
+    if shape:
+        frames, slices, cols = shape
+        return words[:frames * slices].reshape(frames, slices, cols)
+    return words[None]
+
+
+def load_json(path):
+    """Load simulator framedata JSON into a (frames, slices, cols) uint32 array and its row count."""
+    with open(path) as f:
+        doc = json.load(f)
+    res = doc["resolution"]
+    shape = (res["frames"], res["slices"], res["columns"])
+    flat = np.fromiter(
+        (int(w, 16) for frame in doc["data"] for slice_words in frame for w in slice_words),
+        dtype=np.uint32,
+    )
+    return flat.reshape(shape), res["rows"]
+
+
+def load_matrices(path, layout=BOARD_8X10):
+    """Load the "[Slice N]" row bit text written by decode_render.py as one frame of words and its row count."""
+    with open(path, "rb") as f:
+        text = f.read()
+    blocks = MATRIX_SLICE.split(text)[1:]
+    if not blocks:
+        return np.empty((1, 0, 0), dtype=np.uint32), 0
+    first = blocks[0].strip().splitlines()
+    rows, cols = len(first), len(first[0].split())
+    digits = np.frombuffer(b"".join(b"".join(block.split()) for block in blocks), dtype=np.uint8)
+    bits = (digits - ord("0")).reshape(len(blocks), rows, cols)
+    # The text holds raw row bits, a 0 is a lit LED
+    return layout.encode(bits == 0)[None], rows
+
+
+def load_framedata(path, rows=10, layout=BOARD_8X10):
+    """Load framedata from a container, JSON, C header or decoded matrix text file as (words, rows, layout).
+
+    A container records its pin layout and row count; other formats are
+    taken to use ``layout`` and, unless they record it, ``rows``.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+    if magic == MAGIC:
+        header, words = read_framedata(path)
+        return words, header["resolution"]["rows"], Layout.from_header(header)
+    if str(path).endswith(".json"):
+        return (*load_json(path), layout)
+    if magic.startswith(b"[Sl"):
+        return (*load_matrices(path, layout), layout)
+    return load_header(path), rows, layout
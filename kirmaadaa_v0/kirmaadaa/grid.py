@@ -0,0 +1,90 @@
+"""Slice grid geometry (horizontal planes, radial planes, concentric rings) built as arrays.
+
+Every builder returns (vertices, faces): float32 (n, 3) positions and int32
+(m, 4) quads, ready for blender_mesh.mesh_object or any other consumer.
+"""
+import numpy as np
+
+# Corners of a unit cube and its six outward facing quads
+CUBE_CORNERS = np.array([[x, y, z] for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)], dtype=np.float32)
+CUBE_FACES = np.array([
+    [0, 1, 3, 2], [4, 6, 7, 5], [0, 4, 5, 1],
+    [2, 3, 7, 6], [0, 2, 6, 4], [1, 5, 7, 3],
+], dtype=np.int32)
+
+
+def boxes(centers, half_sizes, angles=None):
+    """Cuboids with the given centres and half extents, each turned by an angle about Z."""
+    centers = np.asarray(centers, dtype=np.float32).reshape(-1, 3)
+    corners = CUBE_CORNERS * np.asarray(half_sizes, dtype=np.float32).reshape(-1, 1, 3)
+    corners = np.broadcast_to(corners, (len(centers), 8, 3))
+    if angles is not None:
+        cos, sin = np.cos(angles)[:, None], np.sin(angles)[:, None]
+        x, y = corners[..., 0], corners[..., 1]
+        corners = np.stack([x * cos - y * sin, x * sin + y * cos, corners[..., 2]], axis=-1)
+    vertices = (corners + centers[:, None]).reshape(-1, 3)
+    faces = (CUBE_FACES + 8 * np.arange(len(centers), dtype=np.int32)[:, None, None]).reshape(-1, 4)
+    return vertices.astype(np.float32), faces
+
+
+def horizontal_planes(count=8, scale=1.1, thickness=0.001):
+    """Thin slabs at the count - 1 boundaries between count equal layers of z in [-1, 1]."""
+    z = np.arange(1, count) * (2 / count) - 1
+    centers = np.stack([np.zeros_like(z), np.zeros_like(z), z], axis=-1)
+    return boxes(centers, (scale, scale, thickness))
+
+
+def radial_planes(count=32, scale=1.1, thickness=0.001):
+    """Thin slabs from the axis outwards at the count boundaries between equal wedges.
+
+    Each slab is a half plane, so opposite boundaries are not doubled up
+    the way full planes through the axis would be.
+    """
+    angles = np.arange(count) * (2 * np.pi / count)
+    centers = np.stack([np.cos(angles), np.sin(angles), np.zeros(count)], axis=-1) * (scale / 2)
+    return boxes(centers, (scale / 2, thickness, scale), angles)
+
+
+def concentric_rings(radii=(0.8, 0.6, 0.4, 0.2), height=2.2, thickness=0.01, segments=32):
+    """Hollow cylinders of the given outer radii and wall thickness, centred on the origin."""
+    radii = np.asarray(radii, dtype=np.float32)
+    angles = np.arange(segments) * (2 * np.pi / segments)
+    circle = np.stack([np.cos(angles), np.sin(angles)], axis=-1)
+
+    # Per ring: outer top, outer bottom, inner top, inner bottom loops of `segments` vertices
+    ring_radii = np.stack([radii, radii, radii - thickness, radii - thickness], axis=-1)
+    z = np.array([height / 2, -height / 2, height / 2, -height / 2], dtype=np.float32)
+    xy = ring_radii[:, :, None, None] * circle
+    vertices = np.concatenate([xy, np.broadcast_to(z[None, :, None, None], (*xy.shape[:3], 1))], axis=-1)
+
+    k = np.arange(segments, dtype=np.int32)
+    n = (k + 1) % segments
+    ot, ob, it, ib = (loop * segments for loop in range(4))
+    quads = np.concatenate([
+        np.stack([ob + k, ob + n, ot + n, ot + k], axis=-1),  # outer wall
+        np.stack([it + k, it + n, ib + n, ib + k], axis=-1),  # inner wall
+        np.stack([ot + k, ot + n, it + n, it + k], axis=-1),  # top
+        np.stack([ib + k, ib + n, ob + n, ob + k], axis=-1),  # bottom
+    ])
+    faces = quads + (4 * segments * np.arange(len(radii), dtype=np.int32))[:, None, None]
+    return vertices.reshape(-1, 3).astype(np.float32), faces.reshape(-1, 4)
+
+
+def merge(*meshes):
+    """Concatenate (vertices, faces) meshes into one, offsetting the face indices."""
+    offsets = np.cumsum([0] + [len(vertices) for vertices, _ in meshes[:-1]])
+    vertices = np.concatenate([vertices for vertices, _ in meshes])
+    faces = np.concatenate([faces + offset for (_, faces), offset in zip(meshes, offsets)])
+    return vertices, faces.astype(np.int32)
+
+
+def slice_grid(horizontal_count=8, vertical_count=32, scale=1.1, thickness=0.001, radii=(),
+               ring_height=2.2, ring_thickness=0.01, segments=32):
+    """Complete slicing grid: horizontal planes, radial planes and optional concentric rings."""
+    meshes = [
+        horizontal_planes(horizontal_count, scale, thickness),
+        radial_planes(vertical_count, scale, thickness),
+    ]
+    if len(radii):
+        meshes.append(concentric_rings(radii, ring_height, ring_thickness, segments))
+    return merge(*meshes)
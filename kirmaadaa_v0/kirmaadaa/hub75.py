@@ -0,0 +1,117 @@
+import argparse
+import sys
+
+import numpy as np
+
+from . import instrument
+from .layout import WideLayout
+from .patterns import PATTERNS
+from .pipeline import pattern_source
+
+# HUB75 panels shift one column per clock on six data lines, R1 G1 B1 for
+# the upper half of the panel and R2 G2 B2 for the lower half, then latch
+# the row pair selected on the address lines. Each clocked byte carries
+# those lines on bits 0-5, the order GPIO and DMA drivers use.
+R1, G1, B1, R2, G2, B2 = (1 << bit for bit in range(6))
+WHITE = R1 | G1 | B1
+RED = R1
+
+
+class Hub75Layout(WideLayout):
+    """HUB75 panel, or a chain of them, with binary coded modulation over ``depth`` bit planes.
+
+    Chained panels act as one panel as wide as the chain. The upper and
+    lower halves are scanned together, so there are rows / 2 row pairs.
+    """
+
+    def __init__(self, name, rows=64, cols=128, slices=128, depth=1, color=WHITE):
+        super().__init__(name, rows, cols, slices, word_bits=64)
+        if rows % 2:
+            raise ValueError(f"Panel '{name}' needs an even number of rows, got {rows}")
+        if not 1 <= depth <= 8:
+            raise ValueError(f"Panel '{name}' takes 1 to 8 bit planes, got {depth}")
+        self.depth = depth
+        self.color = color
+        self.scan_rows = rows // 2
+
+        # Clocked byte for each (upper lit, lower lit) pair, indexed upper | lower << 1
+        self.pair_bytes = np.array([0, color, color << 3, color | color << 3], dtype=np.uint8)
+
+    def scan(self, stack):
+        """Turn a (..., rows, cols) stack into (..., rows / 2, depth, cols) clocked bytes.
+
+        The stack must be exactly as wide as the panel or chain; a shorter
+        row would shift every row after it on the wire. A boolean stack
+        lights the panel color; uint8 intensities are shown through their
+        top ``depth`` bits, plane p weighted 2**p when displayed. Planes are
+        least significant first, the order a driver shows them.
+        """
+        stack = np.asarray(stack)
+        rows, cols = stack.shape[-2:]
+        if rows != self.rows:
+            raise ValueError(f"Panel '{self.name}' has {self.rows} rows, got {rows}")
+        if cols != self.cols:
+            raise ValueError(f"Panel '{self.name}' has {self.cols} columns, got {cols}")
+
+        with instrument.stage("scan", items=stack.size // (rows * cols) if stack.size else 0) as s:
+            half = self.scan_rows
+            if stack.dtype == bool:
+                planes = stack[..., None, :, :]
+                if self.depth > 1:
+                    planes = np.broadcast_to(planes, (*stack.shape[:-2], self.depth, rows, cols))
+            else:
+                shifts = np.arange(8 - self.depth, 8, dtype=np.uint8)[:, None, None]
+                planes = (stack.astype(np.uint8)[..., None, :, :] >> shifts) & np.uint8(1)
+            pairs = planes[..., :half, :].view(np.uint8) | planes[..., half:, :].view(np.uint8) << 1
+            stream = np.ascontiguousarray(np.swapaxes(self.pair_bytes[pairs], -3, -2))
+            s.bytes = stream.nbytes
+        return stream
+
+
+# One P1.875 128x64 panel, and the Vortex rotor's two chained back to back
+PANEL_128X64 = Hub75Layout("128x64", rows=64, cols=128)
+PANEL_VORTEX = Hub75Layout("vortex", rows=64, cols=256)
+
+PANELS = {layout.name: layout for layout in (PANEL_128X64, PANEL_VORTEX)}
+
+
+def main():
+    """Generate a procedural pattern as a raw HUB75 scan stream for live display or timing."""
+    parser = argparse.ArgumentParser(description="Write a procedural pattern as a raw HUB75 scan stream.")
+    parser.add_argument("pattern", choices=sorted(PATTERNS), help="Pattern to generate.")
+    parser.add_argument("--frames", type=int, default=1, help="Number of frames.")
+    parser.add_argument("--panel", choices=sorted(PANELS), default="128x64", help="Panel or panel chain.")
+    parser.add_argument("--slices", type=int, help="Slices per frame, defaults to the panel's.")
+    parser.add_argument("--batch", type=int, default=4, help="Frames generated and scanned at a time.")
+    parser.add_argument("-o", "--output", help="File to write the stream to, stdout by default.")
+    parser.add_argument("--discard", action="store_true", help="Only generate the stream, e.g. to time it with --stats.")
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.configure(args)
+
+    layout = PANELS[args.panel]
+    slices = args.slices or layout.slices
+    instrument.count("frames", args.frames)
+    if args.discard:
+        out = None
+    elif args.output:
+        out = open(args.output, "wb")
+    else:
+        out = instrument.counted(sys.stdout.buffer)
+
+    written = 0
+    source = pattern_source(PATTERNS[args.pattern], args.frames, slices, layout.rows, layout.cols, args.batch)
+    try:
+        for batch in source:
+            stream = layout.scan(batch)
+            written += stream.nbytes
+            if out is not None:
+                out.write(memoryview(stream.reshape(-1)))
+    finally:
+        if args.output and not args.discard:
+            out.close()
+    instrument.log(f"{args.frames} frame(s) of {slices} slice(s), {written:,} bytes of scan data")
+
+
+if __name__ == "__main__":
+    main()
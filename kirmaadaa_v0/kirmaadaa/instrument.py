@@ -0,0 +1,270 @@
+"""Opt-in per-stage timing, throughput counters and peak memory, plus leveled progress messages.
+
+Nothing is recorded until ``enable`` is called, by a CLI's ``--stats`` option
+or the KIRMAADAA_STATS environment variable (a .json or .csv path), so the
+hooks in the hot paths cost one global check when switched off. Stages nest;
+each reports its inclusive wall and CPU time and its own time excluding the
+stages inside it, so time spent in a lazy producer is not charged to the
+writer pulling from it. Worker processes hand their totals back to the
+parent with ``take`` and ``merge``.
+
+Messages go through ``log`` (normal) and ``debug`` (per item chatter) on
+stderr; KIRMAADAA_VERBOSE or -q/-v set the level: 0 quiet, 1 normal, 2 debug.
+"""
+import atexit
+import contextlib
+import csv
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _verbosity(value, default=1):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+ENABLED = False
+VERBOSITY = _verbosity(os.environ.get("KIRMAADAA_VERBOSE"))
+
+_stages = {}
+_local = threading.local()
+_counters = {}
+# Stages and counters are recorded from buffered producer threads too
+_lock = threading.Lock()
+_start = None
+_summary_path = None
+
+
+def log(message):
+    """Print a progress message unless quiet."""
+    if VERBOSITY >= 1:
+        print(message, file=sys.stderr)
+
+
+def debug(message):
+    """Print a debugging message only when verbose."""
+    if VERBOSITY >= 2:
+        print(message, file=sys.stderr)
+
+
+def enable(summary_path=None):
+    """Start recording; with a path the summary is written there when the process exits."""
+    global ENABLED, _start, _summary_path
+    if not ENABLED:
+        ENABLED = True
+        _start = (time.perf_counter(), time.process_time())
+        if resource is None:
+            tracemalloc.start()
+    if summary_path and _summary_path is None:
+        atexit.register(lambda: write_summary(summary_path))
+    _summary_path = summary_path or _summary_path
+
+
+class _Stage:
+    __slots__ = ("name", "items", "bytes", "wall", "cpu", "child_wall", "child_cpu")
+
+    def __init__(self, name, items, nbytes):
+        self.name, self.items, self.bytes = name, items, nbytes
+        self.child_wall = self.child_cpu = 0.0
+
+    def __enter__(self):
+        # Stages nest per thread, so a buffered producer thread keeps its own stack
+        if not hasattr(_local, "stack"):
+            _local.stack = []
+        _local.stack.append(self)
+        self.wall, self.cpu = time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        stack = _local.stack
+        stack.pop()
+        if stack:
+            stack[-1].child_wall += wall
+            stack[-1].child_cpu += cpu
+        with _lock:
+            s = _stages.setdefault(self.name, dict.fromkeys(("calls", "wall", "cpu", "self_wall", "self_cpu", "items", "bytes"), 0))
+            s["calls"] += 1
+            s["wall"] += wall
+            s["cpu"] += cpu
+            s["self_wall"] += wall - self.child_wall
+            s["self_cpu"] += cpu - self.child_cpu
+            s["items"] += self.items
+            s["bytes"] += self.bytes
+
+
+# Shared by every stage while switched off; what a block sets on it is discarded
+_IDLE = contextlib.nullcontext(_Stage("", 0, 0))
+
+
+def stage(name, items=0, nbytes=0):
+    """Context manager timing one run of a named stage; a no-op unless enabled.
+
+    ``items`` and ``nbytes`` can also be added on the returned object inside
+    the block, once they are known.
+    """
+    if not ENABLED:
+        return _IDLE
+    return _Stage(name, items, nbytes)
+
+
+def count(name, items=0, nbytes=0):
+    """Add to a named counter, e.g. the frames a run produced."""
+    if ENABLED:
+        with _lock:
+            c = _counters.setdefault(name, {"items": 0, "bytes": 0})
+            c["items"] += items
+            c["bytes"] += nbytes
+
+
+def timed(name, iterable):
+    """Yield from an iterable, timing each step as a stage and counting one item per value."""
+    if not ENABLED:
+        yield from iterable
+        return
+    iterator = iter(iterable)
+    while True:
+        with stage(name) as s:
+            value = next(iterator, s)
+            if value is not s:
+                s.items = 1
+        if value is s:
+            return
+        yield value
+
+
+def take():
+    """Return the stage and counter totals recorded so far and start again from zero.
+
+    A worker process sends these back to its parent, which adds them with ``merge``.
+    """
+    with _lock:
+        totals = {name: dict(s) for name, s in _stages.items()}, {name: dict(c) for name, c in _counters.items()}
+        _stages.clear()
+        _counters.clear()
+    return totals
+
+
+def merge(totals):
+    """Add totals taken in another process to this one's."""
+    stages, counters = totals
+    with _lock:
+        for name, s in stages.items():
+            total = _stages.setdefault(name, dict.fromkeys(s, 0))
+            for key, value in s.items():
+                total[key] += value
+        for name, c in counters.items():
+            total = _counters.setdefault(name, {"items": 0, "bytes": 0})
+            total["items"] += c["items"]
+            total["bytes"] += c["bytes"]
+
+
+def reset():
+    """Forget everything recorded, e.g. the copy of its parent's totals a forked worker starts with."""
+    take()
+    _local.stack = []
+
+
+class CountingWriter:
+    """Wrap a text or binary stream, timing writes as a stage and counting what passes through."""
+
+    def __init__(self, out, name="write"):
+        self.out = out
+        self.name = name
+
+    def write(self, data):
+        with stage(self.name, nbytes=len(data)):
+            return self.out.write(data)
+
+    def __getattr__(self, attr):
+        return getattr(self.out, attr)
+
+
+def counted(out, name="write"):
+    """Return ``out`` wrapped in a CountingWriter when recording, else unchanged."""
+    return CountingWriter(out, name) if ENABLED else out
+
+
+def peak_memory():
+    """Peak memory in bytes: resident set size where available, else traced Python allocations."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[1]
+    return None
+
+
+def summary():
+    """Everything recorded so far as a dict of totals, per-stage rows and counters."""
+    wall = time.perf_counter() - _start[0] if _start else 0.0
+    cpu = time.process_time() - _start[1] if _start else 0.0
+    stages = []
+    with _lock:
+        recorded = [(name, dict(s)) for name, s in _stages.items()]
+        totals = {name: dict(c) for name, c in _counters.items()}
+    for name, s in recorded:
+        row = {"stage": name, **s}
+        row["items_per_s"] = s["items"] / s["wall"] if s["wall"] else 0.0
+        row["bytes_per_s"] = s["bytes"] / s["wall"] if s["wall"] else 0.0
+        stages.append(row)
+    counters = {
+        name: {**c, "items_per_s": c["items"] / wall if wall else 0.0, "bytes_per_s": c["bytes"] / wall if wall else 0.0}
+        for name, c in totals.items()
+    }
+    return {"command": " ".join(sys.argv), "wall": wall, "cpu": cpu, "peak_memory": peak_memory(),
+            "stages": stages, "counters": counters}
+
+
+def write_summary(path):
+    """Write the summary as JSON, or as one CSV row per stage and counter for a .csv path."""
+    result = summary()
+    if str(path).endswith(".csv"):
+        fields = ["stage", "calls", "wall", "cpu", "self_wall", "self_cpu", "items", "bytes", "items_per_s",
+                  "bytes_per_s", "peak_memory"]
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(result["stages"])
+            writer.writerow({"stage": "total", "calls": 1, "wall": result["wall"], "cpu": result["cpu"],
+                             "peak_memory": result["peak_memory"]})
+            for name, c in result["counters"].items():
+                writer.writerow({"stage": f"count:{name}", **c})
+    else:
+        with open(path, "w") as f:
+            json.dump(result, f, indent=4)
+    log(f"Run statistics written to '{path}'")
+
+
+def add_arguments(parser):
+    """Add the shared --stats, --quiet and --verbose options to a CLI parser."""
+    parser.add_argument("--stats", metavar="PATH", help="Record per-stage timings and write them as .json or .csv.")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print errors.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print debugging detail.")
+
+
+def configure(args):
+    """Apply the options added by add_arguments."""
+    global VERBOSITY
+    if args.quiet:
+        VERBOSITY = 0
+    elif args.verbose:
+        VERBOSITY = 2
+    if args.stats:
+        enable(args.stats)
+
+
+if os.environ.get("KIRMAADAA_STATS"):
+    enable(os.environ["KIRMAADAA_STATS"])
@@ -0,0 +1,161 @@
+import numpy as np
+
+from .instrument import stage
+
+# Pin mapping of the current boards. The low byte selects the column,
+# rows 0-7 sit on bits 8-15, row 8 on bit 16 and row 9 on bit 26.
+# Row bits are active low: clearing a bit switches that LED on.
+BASE_WORD = 0x0401FF00
+ROW_BITS = (8, 9, 10, 11, 12, 13, 14, 15, 16, 26)
+
+
+class Layout:
+    """Pin layout of an LED board, compiled once into word lookup tables."""
+
+    def __init__(self, name, rows, cols, slices, base_word=BASE_WORD, row_bits=ROW_BITS, col_bits=None):
+        if len(row_bits) < rows:
+            raise ValueError(f"Layout '{name}' needs {rows} row bits, got {len(row_bits)}")
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        self.slices = slices
+        self.base_word = base_word
+        self.row_bits = tuple(row_bits[:rows])
+        self.col_bits = tuple(range(cols) if col_bits is None else col_bits[:cols])
+        if set(self.row_bits) & set(self.col_bits):
+            raise ValueError(f"Layout '{name}' uses the same bit for a row and a column")
+        if max(self.row_bits + self.col_bits) > 31:
+            raise ValueError(f"Layout '{name}' does not fit in a 32-bit word")
+        if any(not (base_word >> bit) & 1 for bit in self.row_bits):
+            raise ValueError(f"Layout '{name}' base word must keep every row bit set (LEDs off)")
+        self._compile()
+
+    def _compile(self):
+        one = np.uint32(1)
+        byte_values = np.arange(256, dtype=np.uint32)
+
+        # Idle word of each column: base pattern plus its column select bit
+        self.select = np.uint32(self.base_word) | (one << np.array(self.col_bits, dtype=np.uint32))
+
+        # encode_tables[g][p] holds the row bits to clear when pattern p
+        # lights rows 8g..8g+7 of a column
+        self.encode_tables = np.zeros((-(-self.rows // 8), 256), dtype=np.uint32)
+        for row, bit in enumerate(self.row_bits):
+            group, shift = divmod(row, 8)
+            lit = ((byte_values >> np.uint32(shift)) & one).astype(bool)
+            self.encode_tables[group][lit] |= one << np.uint32(bit)
+
+        # decode_tables[k][v] holds the row pattern carried by value v of
+        # word byte k; bytes without row bits are skipped when decoding
+        self.decode_tables = np.zeros((4, 256), dtype=np.uint32)
+        for row, bit in enumerate(self.row_bits):
+            byte, shift = divmod(bit, 8)
+            set_bit = ((byte_values >> np.uint32(shift)) & one).astype(bool)
+            self.decode_tables[byte][set_bit] |= one << np.uint32(row)
+        self.decode_bytes = tuple(sorted({bit // 8 for bit in self.row_bits}))
+
+    @classmethod
+    def from_header(cls, header, name="file"):
+        """Rebuild the layout recorded in a binary container header."""
+        res = header["resolution"]
+        layout = header["layout"]
+        return cls(name, res["rows"], res["columns"], res["slices"], layout["base_word"], layout["row_bits"])
+
+    def encode(self, stack):
+        """Encode a (..., rows, cols) pixel stack into (..., cols) uint32 column words."""
+        stack = np.asarray(stack, dtype=bool)
+        rows, cols = stack.shape[-2:]
+        if rows > self.rows:
+            raise ValueError(f"Board '{self.name}' has {self.rows} rows, got {rows}")
+        if cols > self.cols:
+            raise ValueError(f"Board '{self.name}' has {self.cols} columns, got {cols}")
+
+        with stage("encode", items=stack.size // (rows * cols) if stack.size else 0) as s:
+            # Pack each column's rows into bytes, then look up the bits to clear
+            packed = np.packbits(stack, axis=-2, bitorder="little")
+            cleared = self.encode_tables[0][packed[..., 0, :]]
+            for group in range(1, packed.shape[-2]):
+                cleared |= self.encode_tables[group][packed[..., group, :]]
+            words = self.select[:cols] & ~cleared
+            s.bytes = words.nbytes
+        return words
+
+    def decode(self, words, rows=None, out=None):
+        """Decode (..., cols) column words into (..., rows, cols) uint8 row bits.
+
+        Values are the raw row bits, so like the firmware a 0 means the LED is on.
+        Pass a preallocated uint8 ``out`` array to decode without allocating.
+        """
+        rows = self.rows if rows is None else rows
+        if rows > self.rows:
+            raise ValueError(f"Board '{self.name}' has {self.rows} rows, got {rows}")
+        words = np.ascontiguousarray(words, dtype="<u4")
+        word_bytes = words.view(np.uint8).reshape(*words.shape, 4)
+
+        pattern = np.zeros(words.shape, dtype=np.uint32)
+        for byte in self.decode_bytes:
+            pattern |= self.decode_tables[byte][word_bytes[..., byte]]
+
+        shifts = np.arange(rows, dtype=np.uint32)[:, None]
+        bits = (pattern[..., None, :] >> shifts) & np.uint32(1)
+        if out is None:
+            return bits.astype(np.uint8)
+        np.copyto(out, bits, casting="unsafe")
+        return out
+
+
+class WideLayout:
+    """Column layout of a tall panel, packing any number of rows into one or more words per column.
+
+    Row r of a column sits on bit r % word_bits of word r // word_bits, so a
+    64-row column is a single uint64 and a 10-row one a uint32 with spare bits.
+    With ``active_low`` a cleared bit switches the LED on, as on the boards above.
+    """
+
+    def __init__(self, name, rows, cols, slices, word_bits=64, active_low=False):
+        if word_bits not in (8, 16, 32, 64):
+            raise ValueError(f"Layout '{name}' needs 8, 16, 32 or 64-bit words, got {word_bits}")
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        self.slices = slices
+        self.word_bits = word_bits
+        self.words = -(-rows // word_bits)
+        self.active_low = active_low
+        self.dtype = np.dtype(f"<u{word_bits // 8}")
+
+    def encode(self, stack):
+        """Encode a (..., rows, cols) pixel stack into (..., cols, words) column words."""
+        stack = np.asarray(stack, dtype=bool)
+        rows, cols = stack.shape[-2:]
+        if rows > self.rows:
+            raise ValueError(f"Layout '{self.name}' has {self.rows} rows, got {rows}")
+        if cols > self.cols:
+            raise ValueError(f"Layout '{self.name}' has {self.cols} columns, got {cols}")
+
+        with stage("encode", items=stack.size // (rows * cols) if stack.size else 0) as s:
+            # Lay each column's rows out contiguously, padded to whole words, and
+            # pack them little end first; packing along the last axis is the fast path
+            columns = np.zeros((*stack.shape[:-2], cols, self.words * self.word_bits), dtype=bool)
+            columns[..., :rows] = np.swapaxes(stack, -1, -2)
+            words = np.packbits(columns, axis=-1, bitorder="little").view(self.dtype)
+            if self.active_low:
+                np.invert(words, out=words)
+            s.bytes = words.nbytes
+        return words
+
+    def decode(self, words, rows=None):
+        """Decode (..., cols, words) column words into a (..., rows, cols) boolean lit-pixel array."""
+        rows = self.rows if rows is None else rows
+        words = np.ascontiguousarray(words, dtype=self.dtype)
+        if self.active_low:
+            words = ~words
+        bits = np.unpackbits(words.view(np.uint8), axis=-1, count=rows, bitorder="little")
+        return np.swapaxes(bits, -1, -2).view(bool)
+
+
+BOARD_8X8 = Layout("8x8", rows=8, cols=8, slices=24)
+BOARD_8X10 = Layout("8x10", rows=10, cols=8, slices=24)
+BOARD_WEDGE = Layout("wedge", rows=8, cols=8, slices=32)
+
+BOARDS = {layout.name: layout for layout in (BOARD_8X8, BOARD_8X10, BOARD_WEDGE)}
@@ -0,0 +1,28 @@
+import argparse
+
+from .container import write_framedata
+from .formats import load_framedata
+from .instrument import add_arguments, configure, log, stage
+from .layout import BOARDS
+
+
+def main():
+    """Pack a framedata C header or JSON file into a binary container."""
+    parser = argparse.ArgumentParser(description="Pack framedata into a binary container.")
+    parser.add_argument("input_file", help="C header or JSON framedata file.")
+    parser.add_argument("output_file", help="Path of the .kfd container to write.")
+    parser.add_argument("--rows", type=int, default=10, help="LED rows, for inputs that do not record them.")
+    parser.add_argument("--board", choices=sorted(BOARDS), default="8x10", help="LED board pin layout to record.")
+    add_arguments(parser)
+    args = parser.parse_args()
+    configure(args)
+
+    with stage("load", items=1):
+        words, rows, layout = load_framedata(args.input_file, args.rows, BOARDS[args.board])
+    with stage("write", items=len(words), nbytes=words.nbytes):
+        write_framedata(args.output_file, words, rows, layout)
+    log(f"Packed {words.shape[0]} frame(s) of {words.shape[1]} slices into '{args.output_file}'")
+
+
+if __name__ == "__main__":
+    main()
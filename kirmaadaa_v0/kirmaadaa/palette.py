@@ -0,0 +1,71 @@
+import sys
+
+import numpy as np
+
+
+def deduplicate(words):
+    """Split (frames, slices, cols) words into a palette of unique slices and an index table.
+
+    Returns (palette, indices): palette is (unique, cols) uint32 in order of
+    first appearance and indices is (frames, slices), uint8 when the palette
+    has at most 256 entries and uint16/uint32 beyond that.
+    """
+    words = np.asarray(words, dtype=np.uint32)
+    frames, slices, cols = words.shape
+    flat = words.reshape(-1, cols)
+    if not len(flat):
+        return np.empty((0, cols), dtype=np.uint32), np.empty((frames, slices), dtype=np.uint8)
+
+    # View each slice as one opaque value so equal slices hash and sort together
+    keys = np.ascontiguousarray(flat).view(np.dtype((np.void, flat.itemsize * cols))).ravel()
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+    # Renumber by first appearance so the palette reads in animation order
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    palette = flat[first[order]]
+    dtype = np.uint8 if len(palette) <= 1 << 8 else np.uint16 if len(palette) <= 1 << 16 else np.uint32
+    return palette, rank[inverse.ravel()].astype(dtype).reshape(frames, slices)
+
+
+def expand(palette, indices):
+    """Rebuild the full (frames, slices, cols) word array, the inverse of deduplicate."""
+    return palette[indices]
+
+
+def palette_stats(words, palette, indices):
+    """Size of the raw array against palette plus index table, in bytes."""
+    raw = np.asarray(words).size * 4
+    packed = palette.nbytes + indices.nbytes
+    return {
+        "slices": int(indices.size),
+        "unique_slices": int(len(palette)),
+        "raw_bytes": raw,
+        "palette_bytes": int(palette.nbytes),
+        "index_bytes": int(indices.nbytes),
+        "packed_bytes": int(packed),
+        "ratio": raw / packed if packed else 0.0
+    }
+
+
+def write_palette_header(palette, indices, out=sys.stdout):
+    """Write the palette, index table and a slice lookup routine as a C header."""
+    frames, slices = indices.shape
+    cols = palette.shape[1]
+    index_type = {1: "uint8_t", 2: "uint16_t", 4: "uint32_t"}[indices.itemsize]
+
+    out.write(f"const uint32_t framepalette[{len(palette)}][{cols}]= {{\n")
+    for slice_words in palette:
+        out.write("  {" + ", ".join(f"0x{int(w):08X}" for w in slice_words) + "  },\n")
+    out.write("};\n\n")
+
+    out.write(f"const {index_type} frameindex[{frames}][{slices}]= {{\n")
+    for frame in indices:
+        out.write("  {" + ", ".join(str(int(i)) for i in frame) + "},\n")
+    out.write("};\n\n")
+
+    out.write("// Column words of slice s in frame f, same as framedata[f][s] before deduplication\n")
+    out.write("static inline const uint32_t *framedata_slice(int f, int s) {\n")
+    out.write("  return framepalette[frameindex[f][s]];\n")
+    out.write("}\n")
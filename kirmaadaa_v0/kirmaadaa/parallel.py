@@ -0,0 +1,46 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from . import instrument
+from .encode import load_images
+
+
+def encode_group(paths, layout):
+    """Load and encode the PNG slices of one frame into a (slices, cols) word array."""
+    return layout.encode(load_images(paths))
+
+
+def _start_worker(enabled):
+    # A forked worker starts with a copy of the parent's totals; only its own are sent back
+    instrument.reset()
+    if enabled:
+        instrument.enable()
+
+
+def _encode_task(paths, layout):
+    words = encode_group(paths, layout)
+    return words, instrument.take() if instrument.ENABLED else None
+
+
+def encode_directory(files, layout, slices, jobs=None, chunksize=4):
+    """Yield encoded frames of sorted PNG files in order, spread over a process pool.
+
+    Each task covers one frame of ``slices`` files; a frame is yielded as soon
+    as it and every frame before it are done, so output can be streamed.
+    ``jobs`` defaults to the number of cores, and 1 encodes in this process.
+    With --stats the workers' stage totals are added to this process's, so
+    their wall and CPU times are summed over the workers; peak memory is
+    still this process's own.
+    """
+    groups = [files[i:i + slices] for i in range(0, len(files) // slices * slices, slices)]
+    jobs = jobs or os.cpu_count()
+    if jobs == 1:
+        for group in groups:
+            yield encode_group(group, layout)
+        return
+
+    with ProcessPoolExecutor(jobs, initializer=_start_worker, initargs=(instrument.ENABLED,)) as pool:
+        for words, totals in pool.map(_encode_task, groups, [layout] * len(groups), chunksize=chunksize):
+            if totals:
+                instrument.merge(totals)
+            yield words
@@ -0,0 +1,90 @@
+import argparse
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from .convert import write_output
+from .instrument import add_arguments, configure, stage
+from .layout import BOARDS
+
+
+class Grid(namedtuple("Grid", "frame slice row col shape")):
+    """Open (frame, slice, row, col) index grids that broadcast to the full animation shape."""
+
+    @property
+    def step(self):
+        """Running image index, frame * slices + slice, the counter the PNG generators used."""
+        return self.frame * self.shape[1] + self.slice
+
+
+def index_grid(frames, slices, rows, cols):
+    """Index grids for an animation of the given shape."""
+    return Grid(*np.ogrid[:frames, :slices, :rows, :cols], (frames, slices, rows, cols))
+
+
+def pattern_static(g):
+    # Checkerboard
+    return (g.col + g.row) % 2 == 0
+
+
+def pattern_scrolling(g):
+    # Vertical line scrolling one column per image
+    return g.col == (g.step + g.row) % g.shape[3]
+
+
+def pattern_diagonal_wave(g):
+    # Diagonal wave moving one row per image
+    return g.row == (g.col + g.step) % g.shape[2]
+
+
+PATTERNS = {
+    "static": pattern_static,
+    "scrolling": pattern_scrolling,
+    "diagonal_wave": pattern_diagonal_wave,
+}
+
+
+def generate(pattern, frames, slices=24, rows=10, cols=8):
+    """Evaluate a pattern into a (frames, slices, rows, cols) boolean volume."""
+    g = index_grid(frames, slices, rows, cols)
+    return np.ascontiguousarray(np.broadcast_to(pattern(g), g.shape))
+
+
+def save_images(volume, output_dir):
+    """Write every slice of a volume as frame_NN.png, white on black, for the PNG based tools."""
+    from PIL import Image
+
+    os.makedirs(output_dir, exist_ok=True)
+    images = volume.reshape(-1, *volume.shape[-2:])
+    rgb = np.repeat(images[..., None] * np.uint8(255), 3, axis=-1)
+    for n, image in enumerate(rgb):
+        Image.fromarray(image).save(os.path.join(output_dir, f"frame_{n:02d}.png"))
+    return len(images)
+
+
+def main():
+    """Generate a procedural animation and write it as framedata."""
+    parser = argparse.ArgumentParser(description="Generate procedural pattern framedata.")
+    parser.add_argument("pattern", choices=sorted(PATTERNS), help="Pattern to generate.")
+    parser.add_argument("--frames", type=int, default=1, help="Number of frames.")
+    parser.add_argument("--board", choices=sorted(BOARDS), default="8x10", help="LED board pin layout.")
+    parser.add_argument("--slices", type=int, help="Slices per frame, defaults to the board's.")
+    parser.add_argument("--format", choices=("header", "json", "binary", "palette"), default="header", help="Output format.")
+    parser.add_argument("--compact", action="store_true", help="Write JSON without indentation.")
+    parser.add_argument("--png", metavar="DIR", help="Also write the slices as PNGs to this directory.")
+    add_arguments(parser)
+    args = parser.parse_args()
+    configure(args)
+
+    layout = BOARDS[args.board]
+    slices = args.slices or layout.slices
+    with stage("generate", items=args.frames):
+        volume = generate(PATTERNS[args.pattern], args.frames, slices, layout.rows, layout.cols)
+    if args.png:
+        save_images(volume, args.png)
+    write_output(layout.encode(volume), args.frames, slices, layout, args.format, args.compact)
+
+
+if __name__ == "__main__":
+    main()
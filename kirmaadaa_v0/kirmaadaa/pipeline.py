@@ -0,0 +1,231 @@
+import argparse
+import os
+import queue
+import sys
+import threading
+
+import numpy as np
+
+from . import instrument
+from .container import write_framedata
+from .emit import write_header, write_json
+from .encode import THRESHOLD, load_red
+from .layout import BOARDS
+from .patterns import PATTERNS, index_grid
+
+# Every stage passes batches: arrays whose first axis is frames, so a
+# (batch, slices, rows, cols) volume or a (batch, slices, cols) word array.
+# Sources are iterables of batches, transforms and sinks are callables
+# taking one, and nothing runs until a sink pulls.
+
+
+def pipe(source, *stages):
+    """Feed a source through stages in order, returning whatever the last stage returns."""
+    stream = source
+    for stage in stages:
+        stream = stage(stream)
+    return stream
+
+
+def buffered(size=2):
+    """Produce up to ``size`` batches ahead in a background thread, overlapping I/O with the next stage."""
+    def stage(batches):
+        ahead = queue.Queue(size)
+        done = object()
+        stop = threading.Event()
+
+        def put(item):
+            # Give up once the consumer has gone, instead of blocking on a full queue forever
+            while not stop.is_set():
+                try:
+                    ahead.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def produce():
+            try:
+                for batch in batches:
+                    if not put(batch):
+                        break
+            except BaseException as e:
+                put(e)
+            finally:
+                # Close the source in this thread, releasing its open files
+                close = getattr(batches, "close", None)
+                if close is not None:
+                    close()
+            put(done)
+
+        threading.Thread(target=produce, daemon=True).start()
+        try:
+            while (batch := ahead.get()) is not done:
+                if isinstance(batch, BaseException):
+                    raise batch
+                yield batch
+        finally:
+            stop.set()
+    return stage
+
+
+def unbatch(batches):
+    """Yield the single frames of a stream of batches."""
+    for batch in batches:
+        yield from batch
+
+
+# Sources
+
+def png_source(directory, slices, batch=16):
+    """Yield (batch, slices, rows, cols) red channels of a directory of PNG slices, dropping a partial frame."""
+    files = sorted(os.path.join(directory, f) for f in os.listdir(directory))
+    frames = len(files) // slices
+    for start in range(0, frames, batch):
+        group = files[start * slices:min(start + batch, frames) * slices]
+        images = np.stack([load_red(path) for path in group])
+        yield images.reshape(-1, slices, *images.shape[1:])
+
+
+def pattern_source(pattern, frames, slices=24, rows=10, cols=8, batch=256):
+    """Yield boolean batches of a procedural pattern, see patterns.py."""
+    for start in range(0, frames, batch):
+        g = index_grid(min(batch, frames - start), slices, rows, cols)
+        g = g._replace(frame=g.frame + start)
+        yield np.ascontiguousarray(np.broadcast_to(pattern(g), g.shape))
+
+
+def mesh_source(meshes, layout, radius, height, batch=8, **kwargs):
+    """Yield boolean batches rendered from (vertices, faces) meshes, e.g. blender_mesh.animation_meshes."""
+    from .render import render_slices
+
+    frames = []
+    for vertices, faces in meshes:
+        with instrument.stage("render", items=1):
+            frames.append(render_slices(vertices, faces, layout, radius, height, **kwargs))
+        if len(frames) == batch:
+            yield np.stack(frames)
+            frames = []
+    if frames:
+        yield np.stack(frames)
+
+
+def volume_source(paths, batch=1):
+    """Yield float batches of equally shaped voxel volumes, one volume per frame."""
+    from .resample import load_volume
+
+    for start in range(0, len(paths), batch):
+        yield np.stack([load_volume(path) for path in paths[start:start + batch]])
+
+
+# Transforms
+
+def threshold(level=THRESHOLD):
+    """Light the values above ``level``."""
+    def stage(batches):
+        for batch in batches:
+            with instrument.stage("binarize", items=len(batch)):
+                lit = batch > level
+            yield lit
+    return stage
+
+
+def resample(resampler, level=0.5):
+    """Resample voxel volumes onto the display cells and light the cells above ``level``."""
+    def stage(batches):
+        for batch in batches:
+            with instrument.stage("resample", items=len(batch)):
+                lit = resampler.threshold(batch, level)
+            yield lit
+    return stage
+
+
+def rotate(step=1, offset=0):
+    """Spin the content about the display axis by ``step`` slices per frame, starting at ``offset``."""
+    def stage(batches):
+        frame = 0
+        for batch in batches:
+            slices = batch.shape[1]
+            shift = offset + step * np.arange(frame, frame + len(batch))
+            source = (np.arange(slices) - shift[:, None]) % slices
+            yield np.take_along_axis(batch, source.reshape(*source.shape, *[1] * (batch.ndim - 2)), axis=1)
+            frame += len(batch)
+    return stage
+
+
+def encode(layout):
+    """Encode boolean batches into column words."""
+    def stage(batches):
+        for batch in batches:
+            yield layout.encode(batch)
+    return stage
+
+
+# Sinks; a C header and a container record the frame count first, so those need it
+
+def header_sink(frames, out=sys.stdout):
+    """Write encoded batches as a C framedata header."""
+    return lambda batches: write_header(unbatch(batches), out, frames)
+
+
+def json_sink(rows, frames=None, out=sys.stdout, compact=False):
+    """Write encoded batches as simulator JSON."""
+    return lambda batches: write_json(unbatch(batches), out, rows, frames, compact)
+
+
+def binary_sink(out, frames, layout):
+    """Write encoded batches to a .kfd container path or binary file object."""
+    return lambda batches: write_framedata(out, unbatch(batches), layout.rows, layout, frames)
+
+
+def main():
+    """Build framedata from a pattern, PNG directory or volumes in one streaming pass."""
+    parser = argparse.ArgumentParser(description="Build framedata in one streaming pass.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--pattern", choices=sorted(PATTERNS), help="Procedural pattern.")
+    source.add_argument("--png", metavar="DIR", help="Directory of PNG slices.")
+    source.add_argument("--volume", nargs="+", metavar="FILE", help="Cartesian voxel volumes, one per frame.")
+    parser.add_argument("--frames", type=int, default=1, help="Frames of the pattern.")
+    parser.add_argument("--board", choices=sorted(BOARDS), default="8x10", help="LED board pin layout.")
+    parser.add_argument("--slices", type=int, help="Slices per frame, defaults to the board's.")
+    parser.add_argument("--rotate", type=int, default=0, help="Slices to spin the content by per frame.")
+    parser.add_argument("--format", choices=("header", "json", "binary"), default="header", help="Output format.")
+    parser.add_argument("--compact", action="store_true", help="Write JSON without indentation.")
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.configure(args)
+
+    layout = BOARDS[args.board]
+    slices = args.slices or layout.slices
+    stages = []
+    if args.pattern:
+        frames = args.frames
+        source = pattern_source(PATTERNS[args.pattern], frames, slices, layout.rows, layout.cols)
+    elif args.png:
+        frames = len(os.listdir(args.png)) // slices
+        source = png_source(args.png, slices)
+        stages.append(threshold())
+    else:
+        from .resample import cartesian_resampler, volume_axes
+
+        frames = len(args.volume)
+        source = volume_source(args.volume)
+        shape = next(volume_source(args.volume[:1])).shape[1:]
+        axes = volume_axes("cartesian", shape, 1.0, 2.0)
+        stages.append(resample(cartesian_resampler(axes, layout, 1.0, 2.0)))
+    if args.rotate:
+        stages.append(rotate(args.rotate))
+    stages += [encode(layout), buffered()]
+    instrument.count("frames", frames)
+
+    if args.format == "binary":
+        sink = binary_sink(instrument.counted(sys.stdout.buffer), frames, layout)
+    elif args.format == "json":
+        sink = json_sink(layout.rows, frames, instrument.counted(sys.stdout), args.compact)
+    else:
+        sink = header_sink(frames, instrument.counted(sys.stdout))
+    pipe(source, *stages, sink)
+
+
+if __name__ == "__main__":
+    main()
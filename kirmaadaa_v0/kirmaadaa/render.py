@@ -0,0 +1,74 @@
+import numpy as np
+
+from .instrument import stage
+from .voxelize import column_hits, fill_columns
+
+
+def _offsets(k):
+    """Sub-sample offsets centred in a unit cell, e.g. [-0.25, 0.25] for k=2."""
+    return (np.arange(k) + 0.5) / k - 0.5
+
+
+def render_slices(vertices, faces, layout, radius, height, z_min=None, mode="solid",
+                  supersample=2, threshold=0.0, half_panel=False, bvh=None):
+    """Rasterize a mesh straight into (slices, rows, cols) LED states for a spinning panel.
+
+    Slice s is the panel at angle 2*pi*s/slices. Columns run across the panel
+    from -radius to radius (0 to radius with ``half_panel``), row 0 is the top
+    of a ``height`` tall panel starting at ``z_min`` (centred on z=0 by default).
+
+    Every LED cell is sampled ``supersample`` times along the panel, around the
+    rotation and in height. mode "solid" lights cells whose inside fraction is
+    above ``threshold``; mode "shell" lights cells the surface passes through,
+    which suits wireframes and hollow models.
+    """
+    slices, rows, cols = layout.slices, layout.rows, layout.cols
+    z_min = -height / 2 if z_min is None else z_min
+    off = _offsets(supersample)
+
+    # Sub-sample positions along the panel, around the rotation and in height
+    u_min = 0.0 if half_panel else -radius
+    u = u_min + (np.arange(cols)[:, None] + 0.5 + off) * ((radius - u_min) / cols)
+    theta = 2 * np.pi * (np.arange(slices)[:, None] + off) / slices
+    row_height = height / rows
+    z = z_min + (np.arange(rows)[:, None] + 0.5 + off) * row_height
+
+    # One vertical line per (slice, sub-angle, column, sub-column)
+    x = np.cos(theta)[:, :, None, None] * u[None, None]
+    y = np.sin(theta)[:, :, None, None] * u[None, None]
+    xy = np.stack([x.ravel(), y.ravel()], axis=1)
+    point_index, hit_z = column_hits(vertices, faces, xy, bvh)
+
+    # Inside fraction of each cell, rows counted bottom-up until the final flip
+    k = supersample
+    inside = fill_columns(point_index, hit_z, len(xy), z.ravel())
+    coverage = inside.reshape(slices, k, cols, k, rows, k).mean(axis=(1, 3, 5))
+
+    if mode == "solid":
+        lit = coverage > threshold
+    elif mode == "shell":
+        # Inside sub-samples with an outside neighbour along the panel or in height
+        fine = np.pad(inside.reshape(slices, k, cols * k, rows * k), ((0, 0), (0, 0), (1, 1), (1, 1)))
+        core = fine[..., 1:-1, 1:-1]
+        interior = core & fine[..., :-2, 1:-1] & fine[..., 2:, 1:-1] & fine[..., 1:-1, :-2] & fine[..., 1:-1, 2:]
+        boundary = (core & ~interior).reshape(slices, k, cols, k, rows, k).any(axis=(1, 3, 5))
+
+        # Plus cells where the surface crosses a sub-column inside the row's height
+        row = np.floor((hit_z - z_min) / row_height).astype(np.intp)
+        valid = (row >= 0) & (row < rows)
+        s, _, c, _ = np.unravel_index(point_index[valid], (slices, k, cols, k))
+        crossed = np.zeros((slices, cols, rows), dtype=bool)
+        crossed[s, c, row[valid]] = True
+        lit = boundary | crossed
+    else:
+        raise ValueError(f"Unknown render mode '{mode}'")
+
+    # (slices, cols, rows bottom-up) -> (slices, rows top-down, cols)
+    return lit.transpose(0, 2, 1)[:, ::-1, :]
+
+
+def render_words(vertices, faces, layout, radius, height, **kwargs):
+    """Render a mesh and encode it into one (slices, cols) framedata frame."""
+    with stage("render", items=1):
+        lit = render_slices(vertices, faces, layout, radius, height, **kwargs)
+    return layout.encode(lit)
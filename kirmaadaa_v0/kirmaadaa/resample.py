@@ -0,0 +1,223 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+from . import instrument
+from .layout import BOARDS
+from .volume import load_volume as read_volume
+
+
+def _axis_weights(values, axis, periodic=False):
+    """Linear interpolation (i0, i1, w0, w1) of sample values on an evenly spaced axis.
+
+    Samples outside the axis get zero weights. With ``periodic`` the axis
+    wraps around 2*pi, as the angle axis of a cylindrical grid does.
+    """
+    n = len(axis)
+    step = (axis[-1] - axis[0]) / (n - 1) if n > 1 else 1.0
+    if periodic:
+        values = axis[0] + np.mod(values - axis[0], 2 * np.pi)
+    f = (values - axis[0]) / step
+
+    wraps = periodic and not np.isclose(axis[-1] - axis[0], 2 * np.pi)
+    top = n if wraps else n - 1
+    valid = (f >= 0) & (f <= top)
+    i0 = np.clip(np.floor(f), 0, max(top - 1, 0)).astype(np.intp)
+    t = np.clip(f - i0, 0, 1)
+    i1 = (i0 + 1) % n if wraps else np.minimum(i0 + 1, n - 1)
+    return i0, i1, np.where(valid, 1 - t, 0), np.where(valid, t, 0)
+
+
+def panel_points(layout, radius, height, z_min=None, supersample=2, half_panel=False):
+    """Sample points of every LED cell as (x, y, z) arrays shaped (slices, rows, cols, k**3).
+
+    Uses the same panel geometry as render.render_slices.
+    """
+    slices, rows, cols, k = layout.slices, layout.rows, layout.cols, supersample
+    z_min = -height / 2 if z_min is None else z_min
+    off = (np.arange(k) + 0.5) / k - 0.5
+    u_min = 0.0 if half_panel else -radius
+
+    u = u_min + (np.arange(cols)[:, None] + 0.5 + off) * ((radius - u_min) / cols)
+    theta = 2 * np.pi * (np.arange(slices)[:, None] + off) / slices
+    # Row 0 is the top of the panel
+    z = z_min + height - (np.arange(rows)[:, None] + 0.5 + off) * (height / rows)
+
+    # Axes: slice, row, col, sub-angle, sub-column, sub-height
+    shape = (slices, rows, cols, k, k, k)
+    x = np.cos(theta)[:, None, None, :, None, None] * u[None, None, :, None, :, None]
+    y = np.sin(theta)[:, None, None, :, None, None] * u[None, None, :, None, :, None]
+    z = np.broadcast_to(z[None, :, None, None, None, :], shape)
+    flat = (slices, rows, cols, k ** 3)
+    return np.broadcast_to(x, shape).reshape(flat), np.broadcast_to(y, shape).reshape(flat), z.reshape(flat)
+
+
+class Resampler:
+    """Sparse CSR operator mapping source volumes onto display LED cells.
+
+    Row i of the operator lists the source voxels (``indices``) and weights
+    feeding LED cell i, cells ordered as (slices, rows, cols).
+    """
+
+    def __init__(self, indptr, indices, weights, source_shape, target_shape):
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.source_shape = tuple(source_shape)
+        self.target_shape = tuple(target_shape)
+
+    @classmethod
+    def from_entries(cls, cells, sources, weights, source_shape, target_shape):
+        """Build the CSR arrays from (cell, source, weight) triples, summing duplicates."""
+        keep = weights > 0
+        cells, sources, weights = cells[keep], sources[keep], weights[keep]
+        keys, inverse = np.unique(cells * np.prod(source_shape, dtype=np.int64) + sources, return_inverse=True)
+        summed = np.bincount(inverse, weights=weights)
+        cells, sources = np.divmod(keys, np.prod(source_shape, dtype=np.int64))
+
+        num_cells = int(np.prod(target_shape))
+        indptr = np.zeros(num_cells + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=num_cells), out=indptr[1:])
+        return cls(indptr, sources.astype(np.int64), summed.astype(np.float32), source_shape, target_shape)
+
+    def apply(self, volumes):
+        """Resample (..., *source_shape) volumes into (..., slices, rows, cols) float values."""
+        volumes = np.asarray(volumes)
+        batch = volumes.shape[:volumes.ndim - len(self.source_shape)]
+        flat = volumes.reshape(-1, int(np.prod(self.source_shape)))
+
+        # Gather and weight every entry, then sum each cell's run via cumulative sums
+        weighted = flat[:, self.indices] * self.weights
+        totals = np.zeros((len(flat), len(self.indices) + 1))
+        np.cumsum(weighted, axis=1, out=totals[:, 1:])
+        cells = totals[:, self.indptr[1:]] - totals[:, self.indptr[:-1]]
+        return cells.reshape(*batch, *self.target_shape)
+
+    def threshold(self, volumes, level=0.5):
+        """Resample volumes and light the cells above ``level``."""
+        return self.apply(volumes) > level
+
+    def save(self, path):
+        np.savez(path, indptr=self.indptr, indices=self.indices, weights=self.weights,
+                 source_shape=self.source_shape, target_shape=self.target_shape)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["indptr"], data["indices"], data["weights"],
+                       data["source_shape"], data["target_shape"])
+
+
+def _trilinear(layout, axes, coords, periodic, supersample):
+    """Resampler averaging trilinear samples of each cell taken at the given source coordinates."""
+    source_shape = tuple(len(a) for a in axes)
+    per_axis = [_axis_weights(c.ravel(), a, p) for c, a, p in zip(coords, axes, periodic)]
+    cell = np.repeat(np.arange(layout.slices * layout.rows * layout.cols), supersample ** 3)
+
+    cells, sources, weights = [], [], []
+    for corner in range(8):
+        index = np.zeros(len(cell), dtype=np.int64)
+        weight = np.full(len(cell), 1.0 / supersample ** 3)
+        for axis, (i0, i1, w0, w1) in enumerate(per_axis):
+            upper = (corner >> axis) & 1
+            index = index * source_shape[axis] + (i1 if upper else i0)
+            weight = weight * (w1 if upper else w0)
+        cells.append(cell)
+        sources.append(index)
+        weights.append(weight)
+
+    target_shape = (layout.slices, layout.rows, layout.cols)
+    return Resampler.from_entries(np.concatenate(cells), np.concatenate(sources),
+                                  np.concatenate(weights), source_shape, target_shape)
+
+
+def cartesian_resampler(axes, layout, radius, height, z_min=None, supersample=2, half_panel=False):
+    """Operator from an (x, y, z) voxel grid sampled at the given axis positions."""
+    x, y, z = panel_points(layout, radius, height, z_min, supersample, half_panel)
+    return _trilinear(layout, axes, (x, y, z), (False, False, False), supersample)
+
+
+def cylindrical_resampler(axes, layout, radius, height, z_min=None, supersample=2, half_panel=False):
+    """Operator from an (r, theta, z) grid such as cube_export_script's cylindrical matrix."""
+    x, y, z = panel_points(layout, radius, height, z_min, supersample, half_panel)
+    r, theta = np.hypot(x, y), np.arctan2(y, x)
+    return _trilinear(layout, axes, (r, theta, z), (False, True, False), supersample)
+
+
+RESAMPLERS = {
+    "cartesian": cartesian_resampler,
+    "cylindrical": cylindrical_resampler,
+}
+
+
+def cached_resampler(cache_dir, kind, axes, layout, radius, height, **kwargs):
+    """Load the operator for this geometry from ``cache_dir``, building and saving it on first use."""
+    key = hashlib.sha1()
+    key.update(repr((kind, layout.name, layout.slices, layout.rows, layout.cols,
+                     radius, height, sorted(kwargs.items()))).encode())
+    for axis in axes:
+        key.update(np.asarray(axis, dtype=np.float64).tobytes())
+    path = os.path.join(cache_dir, f"resample_{key.hexdigest()[:16]}.npz")
+
+    if os.path.exists(path):
+        return Resampler.load(path)
+    resampler = RESAMPLERS[kind](axes, layout, radius, height, **kwargs)
+    os.makedirs(cache_dir, exist_ok=True)
+    resampler.save(path)
+    return resampler
+
+
+def load_volume(path):
+    """Load a volume from .kvx, .npy or the old cylindrical matrix JSON (the "matrix" key)."""
+    if path.endswith(".kvx"):
+        return read_volume(path)[0].astype(np.float32)
+    if path.endswith(".json"):
+        with open(path) as f:
+            return np.array(json.load(f)["matrix"], dtype=np.float32)
+    return np.load(path)
+
+
+def volume_axes(kind, shape, radius, height, z_min=None):
+    """Axes placing a volume of the given shape so it fills the display."""
+    z_min = -height / 2 if z_min is None else z_min
+    z = np.linspace(z_min, z_min + height, shape[2])
+    if kind == "cylindrical":
+        return np.linspace(0, radius, shape[0]), np.linspace(0, 2 * np.pi, shape[1]), z
+    return np.linspace(-radius, radius, shape[0]), np.linspace(-radius, radius, shape[1]), z
+
+
+def main():
+    """Resample a voxel volume into one frame of framedata."""
+    from .emit import write_header
+
+    parser = argparse.ArgumentParser(description="Resample a voxel volume into framedata.")
+    parser.add_argument("input_file", help="Volume as .kvx, .npy or cylindrical matrix JSON.")
+    parser.add_argument("--kind", choices=sorted(RESAMPLERS), default="cartesian", help="Source grid type.")
+    parser.add_argument("--board", choices=sorted(BOARDS), default="wedge", help="LED board pin layout.")
+    parser.add_argument("--radius", type=float, default=1.0, help="Panel half width.")
+    parser.add_argument("--height", type=float, default=2.0, help="Panel height.")
+    parser.add_argument("--level", type=float, default=0.5, help="Fill level above which an LED is lit.")
+    parser.add_argument("--cache", default=os.path.join(os.path.expanduser("~"), ".cache", "kirmaadaa"),
+                        help="Directory caching resampling operators.")
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.configure(args)
+
+    with instrument.stage("load"):
+        volume = load_volume(args.input_file)
+    layout = BOARDS[args.board]
+    axes = volume_axes(args.kind, volume.shape, args.radius, args.height)
+    with instrument.stage("operator"):
+        resampler = cached_resampler(args.cache, args.kind, axes, layout, args.radius, args.height)
+    with instrument.stage("resample", items=1):
+        lit = resampler.threshold(volume[None], args.level)
+    instrument.count("frames", 1)
+    write_header(layout.encode(lit), instrument.counted(sys.stdout))
+
+
+if __name__ == "__main__":
+    main()
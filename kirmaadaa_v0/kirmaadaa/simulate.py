@@ -0,0 +1,116 @@
+import argparse
+import os
+
+import numpy as np
+
+from . import instrument
+from .decode import decode_pixels
+from .formats import load_framedata
+from .layout import BOARDS
+
+
+class PovSimulator:
+    """Persistence-of-vision model of the spinning panel.
+
+    The panel turns at ``rpm`` and the firmware steps to the next slice every
+    ``slice_us`` microseconds (one revolution / slices by default), keeping
+    the LEDs on for ``duty`` of each step. The time every slice is shown at
+    every angle is computed once, so exposure for any number of frames is a
+    single tensor product.
+    """
+
+    def __init__(self, slices, rpm, slice_us=None, duty=1.0, angular_bins=360, revolutions=1, oversample=16):
+        self.slices = slices
+        self.rpm = rpm
+        self.angular_bins = angular_bins
+        period = 60.0 / rpm
+        self.slice_period = period / slices if slice_us is None else slice_us * 1e-6
+        self.on_time = self.slice_period * duty
+
+        # Sample time finely over the integration window, find the slice on at
+        # each instant and add the instant's length to that (angle bin, slice)
+        steps = angular_bins * oversample * revolutions
+        dt = period * revolutions / steps
+        t = (np.arange(steps) + 0.5) * dt
+        step = np.floor(t / self.slice_period).astype(np.int64)
+        on = (t - step * self.slice_period) < self.on_time
+        angle_bin = (np.arange(steps) // oversample) % angular_bins
+        self.on_matrix = np.bincount(
+            angle_bin[on] * slices + step[on] % slices, minlength=angular_bins * slices
+        ).reshape(angular_bins, slices).astype(np.float32) * dt
+
+    def exposure(self, lit):
+        """LED on-time in seconds for (frames, slices, rows, cols) lit states, shaped (frames, bins, rows, cols)."""
+        lit = np.asarray(lit)
+        frames, slices, rows, cols = lit.shape
+        states = lit.reshape(frames, slices, rows * cols).astype(np.float32)
+        volume = np.tensordot(self.on_matrix, states, axes=([1], [1]))
+        return volume.transpose(1, 0, 2).reshape(frames, self.angular_bins, rows, cols)
+
+    def top_view(self, exposure, size=64):
+        """Project exposure volumes onto a top-down (frames, size, size) image, summed over rows.
+
+        The panel spans the diameter, so each point is swept twice per turn:
+        once by each half of the panel.
+        """
+        frames, bins, rows, cols = exposure.shape
+        lin = (np.arange(size) + 0.5) / size * 2 - 1
+        x, y = np.meshgrid(lin, -lin)
+        rho, phi = np.hypot(x, y), np.mod(np.arctan2(y, x), 2 * np.pi)
+        inside = rho < 1
+
+        # Panel column of the half pointing at phi and of the opposite half
+        near_col = np.clip(((rho + 1) / 2 * cols).astype(np.intp), 0, cols - 1)
+        far_col = np.clip(((1 - rho) / 2 * cols).astype(np.intp), 0, cols - 1)
+        near_bin = (phi / (2 * np.pi) * bins).astype(np.intp) % bins
+        far_bin = (near_bin + bins // 2) % bins
+
+        summed = exposure.sum(axis=2)
+        image = summed[:, near_bin, near_col] + summed[:, far_bin, far_col]
+        return np.where(inside, image, 0)
+
+
+def main():
+    """Simulate framedata files and report per-frame exposure, optionally saving top views."""
+    parser = argparse.ArgumentParser(description="Headless persistence-of-vision simulation of framedata.")
+    parser.add_argument("input_files", nargs="+", help="Framedata files (.kfd, .json or C header).")
+    parser.add_argument("--rows", type=int, default=10, help="LED rows, for inputs that do not record them.")
+    parser.add_argument("--board", choices=sorted(BOARDS), default="8x10", help="LED board pin layout, for inputs that do not record it.")
+    parser.add_argument("--rpm", type=float, default=1200, help="Rotation speed.")
+    parser.add_argument("--slice-us", type=float, help="Slice period in microseconds, one turn / slices by default.")
+    parser.add_argument("--duty", type=float, default=1.0, help="Fraction of each slice period the LEDs are on.")
+    parser.add_argument("--bins", type=int, default=360, help="Angular resolution of the simulation.")
+    parser.add_argument("--png", help="Directory to save top-view PNGs in.")
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.configure(args)
+
+    for path in args.input_files:
+        with instrument.stage("load"):
+            words, rows, layout = load_framedata(path, args.rows, BOARDS[args.board])
+        instrument.count("frames", len(words))
+        with instrument.stage("decode", items=len(words)):
+            lit = decode_pixels(words, rows, layout)
+        sim = PovSimulator(words.shape[1], args.rpm, args.slice_us, args.duty, args.bins)
+        with instrument.stage("simulate", items=len(words)):
+            exposure = sim.exposure(lit)
+
+        per_frame = exposure.sum(axis=(1, 2, 3))
+        dark = int((per_frame == 0).sum())
+        instrument.log(f"{path}: {len(words)} frame(s), {per_frame.mean() * 1e3:.1f} LED-ms lit per turn on average, {dark} dark")
+
+        if args.png:
+            from PIL import Image
+
+            os.makedirs(args.png, exist_ok=True)
+            images = sim.top_view(exposure)
+            peak = images.max() or 1.0
+            name = os.path.splitext(os.path.basename(path))[0]
+            with instrument.stage("save", items=len(images)):
+                for n, image in enumerate(images):
+                    Image.fromarray((image / peak * 255).astype(np.uint8)).save(os.path.join(args.png, f"{name}_{n:04d}.png"))
+            instrument.log(f"Top views saved to '{args.png}'")
+
+
+if __name__ == "__main__":
+    main()
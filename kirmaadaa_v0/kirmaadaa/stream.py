@@ -0,0 +1,304 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import os
+import struct
+import sys
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from . import instrument
+from .formats import load_framedata
+
+GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+FRAME = struct.Struct("<IHHH")  # frame index, slices, cols, rows; uint32 words follow
+ACK = b"A"
+
+OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+def accept_key(key):
+    """Sec-WebSocket-Accept value for a client key."""
+    return base64.b64encode(hashlib.sha1(key + GUID).digest())
+
+
+def _mask(payload, key):
+    """XOR a payload with a 4-byte WebSocket mask."""
+    data = np.frombuffer(payload, dtype=np.uint8)
+    return (data ^ np.resize(np.frombuffer(key, dtype=np.uint8), data.size)).tobytes()
+
+
+def write_message(writer, payload, opcode=OP_BINARY, mask=False):
+    """Queue one unfragmented WebSocket message; clients must mask, servers must not."""
+    size = len(payload)
+    if size < 126:
+        head = struct.pack("!BB", 0x80 | opcode, size | (0x80 if mask else 0))
+    elif size < 1 << 16:
+        head = struct.pack("!BBH", 0x80 | opcode, 126 | (0x80 if mask else 0), size)
+    else:
+        head = struct.pack("!BBQ", 0x80 | opcode, 127 | (0x80 if mask else 0), size)
+    if mask:
+        key = os.urandom(4)
+        writer.write(head + key + _mask(payload, key))
+    else:
+        writer.write(head + payload)
+
+
+async def read_message(reader):
+    """Read one WebSocket message as (opcode, payload)."""
+    first, second = await reader.readexactly(2)
+    size = second & 0x7F
+    if size == 126:
+        (size,) = struct.unpack("!H", await reader.readexactly(2))
+    elif size == 127:
+        (size,) = struct.unpack("!Q", await reader.readexactly(8))
+    key = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(size)
+    return first & 0x0F, _mask(payload, key) if key else payload
+
+
+def pack_frame(index, words, rows):
+    """Encode one (slices, cols) frame as a binary message payload."""
+    slices, cols = words.shape
+    return FRAME.pack(index, slices, cols, rows) + np.ascontiguousarray(words, dtype="<u4").tobytes()
+
+
+def unpack_frame(payload):
+    """Decode a binary message payload into (index, rows, words)."""
+    index, slices, cols, rows = FRAME.unpack_from(payload)
+    words = np.frombuffer(payload, dtype="<u4", offset=FRAME.size).reshape(slices, cols)
+    return index, rows, words
+
+
+class FrameStreamer:
+    """Push frames to a display over a persistent WebSocket, keeping only the newest unsent frame.
+
+    The display acknowledges every frame it shows; at most `window` frames
+    are in flight, and a frame offered while the sender is blocked replaces
+    the pending one and counts as dropped, so a slow link lags by at most
+    one frame instead of building an unbounded queue.
+    """
+
+    def __init__(self, url, rows, window=2):
+        self.url = urlsplit(url)
+        self.rows = rows
+        self.credit = asyncio.Semaphore(window)
+        self.pending = None
+        self.ready = asyncio.Event()
+        self.sent = self.dropped = self.acked = self.bytes = 0
+        self.reader = self.writer = None
+        self.tasks = []
+
+    async def connect(self):
+        """Open the connection and start the sender and acknowledgement tasks."""
+        host, port = self.url.hostname, self.url.port or 80
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        key = base64.b64encode(os.urandom(16))
+        self.writer.write(
+            f"GET {self.url.path or '/'} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+            "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key.decode()}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode()
+        )
+        response = await self.reader.readuntil(b"\r\n\r\n")
+        if b" 101 " not in response.split(b"\r\n", 1)[0] or accept_key(key) not in response:
+            raise ConnectionError(f"WebSocket handshake with {host}:{port} failed")
+        self.tasks = [asyncio.create_task(self._send_loop()), asyncio.create_task(self._ack_loop())]
+        return self
+
+    def check(self):
+        """Raise if the sender or acknowledgement task has stopped, e.g. because the display went away."""
+        for task in self.tasks:
+            if task.done() and not task.cancelled():
+                error = task.exception()
+                if error is not None:
+                    raise ConnectionError(f"Lost the display connection: {error!r}") from error
+                raise ConnectionError("The display closed the connection")
+
+    def offer(self, index, words):
+        """Hand the sender a frame without waiting; an unsent older frame is dropped."""
+        self.check()
+        if self.pending is not None:
+            self.dropped += 1
+        self.pending = (index, words)
+        self.ready.set()
+
+    async def _send_loop(self):
+        while True:
+            await self.ready.wait()
+            await self.credit.acquire()
+            index, words = self.pending
+            self.pending = None
+            self.ready.clear()
+            payload = pack_frame(index, words, self.rows)
+            write_message(self.writer, payload, mask=True)
+            await self.writer.drain()
+            self.sent += 1
+            self.bytes += len(payload)
+
+    async def _ack_loop(self):
+        while True:
+            opcode, payload = await read_message(self.reader)
+            if opcode == OP_CLOSE:
+                break
+            if opcode == OP_PING:
+                write_message(self.writer, payload, OP_PONG, mask=True)
+            elif payload == ACK:
+                self.acked += 1
+                self.credit.release()
+
+    async def stream(self, words, fps, loop=False):
+        """Offer frames of a (frames, slices, cols) array at a fixed rate."""
+        if not len(words):
+            raise ValueError("No frames to stream")
+        start = time.perf_counter()
+        tick = 0
+        while True:
+            for index in range(len(words)):
+                # Yield on every tick, even behind schedule, so the sender gets to run
+                delay = start + tick / fps - time.perf_counter()
+                await asyncio.sleep(max(delay, 0))
+                self.offer(index, words[index])
+                tick += 1
+            if not loop:
+                break
+        # Let the last frame go out before returning
+        while self.pending is not None:
+            self.check()
+            await asyncio.sleep(1 / fps)
+
+    async def close(self):
+        """Close the connection once the display has acknowledged the frames in flight."""
+        sender, acks = self.tasks
+        sender.cancel()
+        write_message(self.writer, struct.pack("!H", 1000), OP_CLOSE, mask=True)
+        await self.writer.drain()
+        # The display answers the close after its last ack
+        try:
+            await asyncio.wait_for(acks, timeout=5)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            acks.cancel()
+        self.writer.close()
+
+    def stats(self):
+        """Counters for sent, dropped and acknowledged frames and payload bytes."""
+        return {"sent": self.sent, "dropped": self.dropped, "acked": self.acked, "bytes": self.bytes}
+
+
+class MockDisplay:
+    """Local WebSocket endpoint that behaves like the display for tests and benchmarks.
+
+    Every frame is decoded, kept as `last`, held for `refresh` seconds to
+    mimic the display showing it, then acknowledged.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, refresh=0.0):
+        self.host, self.port, self.refresh = host, port, refresh
+        self.received = 0
+        self.last = None
+        self.server = None
+
+    async def start(self):
+        """Start listening; port 0 picks a free port, stored back in `port`."""
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/"
+
+    async def _handle(self, reader, writer):
+        request = await reader.readuntil(b"\r\n\r\n")
+        headers = dict(
+            line.split(b": ", 1) for line in request.split(b"\r\n")[1:] if b": " in line
+        )
+        key = headers.get(b"Sec-WebSocket-Key", b"").strip()
+        writer.write(
+            b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: " + accept_key(key) + b"\r\n\r\n"
+        )
+        try:
+            while True:
+                opcode, payload = await read_message(reader)
+                if opcode == OP_CLOSE:
+                    write_message(writer, payload[:2], OP_CLOSE)
+                    break
+                if opcode == OP_BINARY:
+                    self.last = unpack_frame(payload)
+                    self.received += 1
+                    if self.refresh:
+                        await asyncio.sleep(self.refresh)
+                    write_message(writer, ACK, OP_TEXT)
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        writer.close()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def run(args):
+    """Stream a framedata file to a display, or to a local mock display with --mock."""
+    mock = None
+    url = args.url
+    if args.mock or args.serve:
+        mock = await MockDisplay(port=args.port, refresh=args.refresh).start()
+        url = mock.url
+        instrument.log(f"Mock display listening on {url}")
+        if args.serve:
+            await mock.server.serve_forever()
+
+    with instrument.stage("load"):
+        words, rows, _ = load_framedata(args.input_file, rows=args.rows)
+
+    streamer = await FrameStreamer(url, rows, window=args.window).connect()
+    start = time.perf_counter()
+    try:
+        await streamer.stream(words, args.fps, loop=args.loop)
+        await streamer.close()
+        if mock:
+            await mock.close()
+    finally:
+        elapsed = time.perf_counter() - start
+        stats = streamer.stats()
+        instrument.count("frames", stats["sent"], stats["bytes"])
+        instrument.log(
+            f"Sent {stats['sent']} frame(s), dropped {stats['dropped']}, {stats['bytes']} bytes "
+            f"in {elapsed:.2f}s ({stats['sent'] / elapsed:.1f} fps)"
+        )
+
+
+def main():
+    """Stream framedata live to a display over WebSocket."""
+    parser = argparse.ArgumentParser(description="Stream framedata to a display over WebSocket.")
+    parser.add_argument("input_file", nargs="?", help="C header, JSON or .kfd framedata file; not needed with --serve.")
+    parser.add_argument("--url", default="ws://192.168.4.1:81/", help="Display WebSocket endpoint.")
+    parser.add_argument("--fps", type=float, default=30.0, help="Frames offered per second.")
+    parser.add_argument("--rows", type=int, default=10, help="LED rows, for inputs that do not record them.")
+    parser.add_argument("--window", type=int, default=2, help="Frames in flight before waiting for an ack.")
+    parser.add_argument("--loop", action="store_true", help="Repeat the animation until interrupted.")
+    parser.add_argument("--mock", action="store_true", help="Stream to a local mock display instead.")
+    parser.add_argument("--serve", action="store_true", help="Only run the mock display.")
+    parser.add_argument("--port", type=int, default=0, help="Mock display port, 0 for any free port.")
+    parser.add_argument("--refresh", type=float, default=0.0, help="Seconds the mock display holds each frame.")
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.configure(args)
+    if not args.input_file and not args.serve:
+        parser.error("an input file is required unless --serve is given")
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+    except (ConnectionError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
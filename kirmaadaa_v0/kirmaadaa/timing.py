@@ -0,0 +1,157 @@
+import argparse
+import math
+import sys
+
+import numpy as np
+
+from . import instrument
+
+
+class SliceTiming:
+    """Per-bucket slice start offsets, precomputed so the ISR does a table lookup instead of dividing.
+
+    Buckets are spaced geometrically in revolution period, the value the hall
+    or IR interrupt measures directly, so each covers the same relative speed
+    range and the offsets are off by the same fraction of a slice at every
+    speed. The firmware finds its bucket with a binary search over the bucket
+    start periods. Pass ``max_error``, in slices, to pick the bucket count
+    that keeps the error below it instead of a fixed ``buckets``.
+    """
+
+    def __init__(self, slice_counts, rpm_min, rpm_max, tick_hz=1_000_000, buckets=64, min_slice_us=None,
+                 max_error=None):
+        if not 0 < rpm_min < rpm_max:
+            raise ValueError("Need 0 < rpm_min < rpm_max")
+        self.slice_counts = tuple(slice_counts)
+        self.tick_hz = tick_hz
+        self.period_min = int(math.floor(60 * tick_hz / rpm_max))
+        self.period_max = int(math.ceil(60 * tick_hz / rpm_min))
+        self.min_slice_us = min_slice_us
+        if max_error is None:
+            self._build(buckets)
+            return
+        # A bucket spanning lo..hi is off by up to (slices - 1) * (hi - lo) / (hi + lo) slices,
+        # plus rounding, so start from that count and add buckets until the tables fit
+        q = max_error / (max(self.slice_counts) - 1)
+        buckets = max(1, math.ceil(math.log(self.period_max / self.period_min) / math.log((1 + q) / (1 - q))))
+        self._build(buckets)
+        while max(self.worst_error(slices)[0] for slices in self.slice_counts) > max_error:
+            buckets += 1
+            self._build(buckets)
+
+    def _build(self, buckets):
+        """Compute the bucket edges and every table for a bucket count."""
+        self.buckets = buckets
+        span = self.period_max / self.period_min
+        edges = np.rint(self.period_min * span ** (np.arange(buckets + 1) / buckets))
+        edges = edges.astype(np.int64)
+        if np.any(np.diff(edges) < 1):
+            raise ValueError(f"{buckets} buckets is more than the {self.period_max - self.period_min} ticks of period range")
+        self.period_lo = edges[:-1]
+        self.period_hi = edges[1:]
+        # The harmonic mean splits the worst error evenly between the two ends of a bucket
+        self.period = 2 * self.period_lo * self.period_hi / (self.period_lo + self.period_hi)
+
+        # Offset of slice k from the revolution pulse, rounded without accumulating error
+        self.offsets = {
+            slices: np.rint(self.period[:, None] * np.arange(slices) / slices).astype(np.uint32)
+            for slices in self.slice_counts
+        }
+
+        # Worst offset error of every bucket in slices, at either end of its period range
+        self.error = {}
+        for slices, table in self.offsets.items():
+            k = np.arange(slices)
+            worst = [np.max(np.abs(table - edge[:, None] * k / slices), axis=1) / (edge / slices)
+                     for edge in (self.period_lo, self.period_hi)]
+            self.error[slices] = np.maximum(*worst)
+
+        # Most slices each bucket can show when one slice needs min_slice_us, at its fastest speed
+        self.max_slices = None
+        if self.min_slice_us:
+            self.max_slices = (self.period_lo / self.tick_hz * 1e6 // self.min_slice_us).astype(np.int64)
+
+    def worst_error(self, slices):
+        """(error in slices, error in microseconds, rpm) of the worst slice offset for a slice count."""
+        errors = self.error[slices]
+        b = int(np.argmax(errors))
+        slice_us = self.period_lo[b] / slices / self.tick_hz * 1e6
+        return errors[b], errors[b] * slice_us, self.rpm_range(b)[1]
+
+    def rpm_range(self, bucket):
+        """(slowest, fastest) rpm covered by a bucket."""
+        return 60 * self.tick_hz / self.period_hi[bucket], 60 * self.tick_hz / self.period_lo[bucket]
+
+    def report(self, out=sys.stderr):
+        """Print the rpm range, slice period and feasible slice count of every bucket."""
+        for b in range(self.buckets):
+            slow, fast = self.rpm_range(b)
+            line = f"bucket {b:3d}: {slow:8.1f}-{fast:8.1f} rpm"
+            for slices in self.slice_counts:
+                line += f", {slices} slices every {self.period[b] / slices / self.tick_hz * 1e6:7.1f} us"
+                line += f" (off by up to {self.error[slices][b]:.3f})"
+            if self.max_slices is not None:
+                line += f", max {self.max_slices[b]} slices"
+            out.write(line + "\n")
+        for slices in self.slice_counts:
+            error, error_us, rpm = self.worst_error(slices)
+            out.write(f"{slices} slices: worst offset error {error:.3f} slices ({error_us:.1f} us) at {rpm:.0f} rpm\n")
+
+    def write_header(self, out=sys.stdout):
+        """Write the tables and the bucket lookup routine as a C header."""
+        out.write(f"#define SLICE_TIMER_HZ {self.tick_hz}\n")
+        out.write(f"#define SLICE_BUCKETS {self.buckets}\n\n")
+
+        out.write("// Shortest revolution period of each bucket in timer ticks, ascending\n")
+        out.write(f"const uint32_t slice_bucket_start[{self.buckets}]= {{\n")
+        out.write("  " + ", ".join(str(int(v)) for v in self.period_lo) + "\n};\n\n")
+
+        for slices, table in self.offsets.items():
+            error, error_us, _ = self.worst_error(slices)
+            out.write(f"// Timer ticks from the revolution pulse to the start of each of {slices} slices,\n")
+            out.write(f"// at most {error:.3f} slices ({error_us:.1f} us) off\n")
+            out.write(f"const uint32_t slice_offsets_{slices}[{self.buckets}][{slices}]= {{\n")
+            for b, row in enumerate(table):
+                slow, fast = self.rpm_range(b)
+                out.write("  {" + ", ".join(str(int(v)) for v in row) + f"}},  // {slow:.0f}-{fast:.0f} rpm\n")
+            out.write("};\n\n")
+
+        if self.max_slices is not None:
+            out.write("// Most slices per revolution the firmware keeps up with in each bucket\n")
+            out.write(f"const uint16_t slice_max[{self.buckets}]= {{\n")
+            out.write("  " + ", ".join(str(int(min(v, 0xFFFF))) for v in self.max_slices) + "\n};\n\n")
+
+        out.write("// Bucket of a measured revolution period in timer ticks, clamped to the table\n")
+        out.write("static inline uint32_t slice_bucket(uint32_t period) {\n")
+        out.write("  uint32_t lo = 0, hi = SLICE_BUCKETS - 1;\n")
+        out.write("  while (lo < hi) {\n")
+        out.write("    uint32_t mid = (lo + hi + 1) >> 1;\n")
+        out.write("    if (period >= slice_bucket_start[mid]) lo = mid; else hi = mid - 1;\n")
+        out.write("  }\n")
+        out.write("  return lo;\n")
+        out.write("}\n")
+
+
+def main():
+    """Generate an rpm-bucketed slice timing header."""
+    parser = argparse.ArgumentParser(description="Generate rpm-bucketed slice timing tables for the firmware.")
+    parser.add_argument("--slices", type=int, nargs="+", default=[24, 32], help="Slice counts to build tables for.")
+    parser.add_argument("--rpm", type=float, nargs=2, default=[300, 3000], metavar=("MIN", "MAX"), help="Speed range.")
+    parser.add_argument("--tick-hz", type=int, default=1_000_000, help="Timer tick rate, 1 MHz for micros().")
+    parser.add_argument("--buckets", type=int, default=64, help="Number of buckets.")
+    parser.add_argument("--max-error", type=float, metavar="SLICES",
+                        help="Pick the bucket count that keeps slice offsets within this many slices instead.")
+    parser.add_argument("--min-slice-us", type=float, help="Shortest slice the firmware can show, to report limits.")
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.configure(args)
+
+    with instrument.stage("build", items=len(args.slices)):
+        timing = SliceTiming(args.slices, *args.rpm, args.tick_hz, args.buckets, args.min_slice_us, args.max_error)
+    timing.write_header(instrument.counted(sys.stdout))
+    if instrument.VERBOSITY:
+        timing.report()
+
+
+if __name__ == "__main__":
+    main()
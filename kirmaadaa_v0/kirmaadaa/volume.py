@@ -0,0 +1,164 @@
+"""Bit-packed, chunk-compressed volume files (.kvx).
+
+Layout, all little endian:
+
+    magic "KVOX", u16 version, u16 reserved,
+    u32 shape[0], u32 shape[1], u32 shape[2], u32 chunk depth, u32 metadata length,
+    metadata as UTF-8 JSON (the resolution block),
+    chunk index of (u64 offset, u32 length) per chunk,
+    zlib-compressed chunks of ``chunk depth`` bit-packed planes along the first axis.
+"""
+import json
+import struct
+import zlib
+
+import numpy as np
+
+MAGIC = b"KVOX"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIIII")
+INDEX_ENTRY = struct.Struct("<QI")
+
+
+class VolumeWriter:
+    """Stream a binary volume to disk a few planes at a time.
+
+    Planes along the first axis are buffered until a chunk is full, so
+    memory stays at one chunk no matter how large the volume is.
+    """
+
+    def __init__(self, path, shape, resolution=None, chunk_depth=8, level=6):
+        self.shape = tuple(int(n) for n in shape)
+        self.chunk_depth = chunk_depth
+        self.level = level
+        self.num_chunks = -(-self.shape[0] // chunk_depth)
+        self.index = []
+        self.pending = []
+        self.planes = 0
+
+        meta = json.dumps(resolution or {}).encode()
+        self.f = open(path, "wb")
+        self.f.write(HEADER.pack(MAGIC, VERSION, 0, *self.shape, chunk_depth, len(meta)))
+        self.f.write(meta)
+        # Index is filled in on close, once chunk sizes are known
+        self.index_offset = self.f.tell()
+        self.f.write(bytes(INDEX_ENTRY.size * self.num_chunks))
+
+    def write(self, planes):
+        """Append one or more (shape[1], shape[2]) planes along the first axis."""
+        planes = np.asarray(planes, dtype=bool).reshape(-1, *self.shape[1:])
+        if self.planes + len(planes) > self.shape[0]:
+            raise ValueError(f"Volume only has {self.shape[0]} planes")
+        self.pending.append(planes)
+        self.planes += len(planes)
+
+        buffered = sum(len(p) for p in self.pending)
+        if buffered >= self.chunk_depth:
+            data = np.concatenate(self.pending)
+            full = len(data) // self.chunk_depth * self.chunk_depth
+            for start in range(0, full, self.chunk_depth):
+                self._write_chunk(data[start:start + self.chunk_depth])
+            self.pending = [data[full:]]
+
+    def _write_chunk(self, planes):
+        payload = zlib.compress(np.packbits(planes).tobytes(), self.level)
+        self.index.append((self.f.tell(), len(payload)))
+        self.f.write(payload)
+
+    def close(self):
+        if self.f.closed:
+            return
+        if self.planes != self.shape[0]:
+            self.f.close()
+            raise ValueError(f"Volume has {self.shape[0]} planes but only {self.planes} were written")
+        rest = np.concatenate(self.pending) if self.pending else np.empty((0, *self.shape[1:]), dtype=bool)
+        if len(rest):
+            self._write_chunk(rest)
+        self.f.seek(self.index_offset)
+        self.f.write(b"".join(INDEX_ENTRY.pack(*entry) for entry in self.index))
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            # Leave the incomplete file as is and let the original error through
+            self.f.close()
+            return
+        self.close()
+
+
+class VolumeReader:
+    """Lazily read a .kvx volume, decompressing only the chunks an index touches."""
+
+    def __init__(self, path):
+        self.f = open(path, "rb")
+        raw = self.f.read(HEADER.size)
+        if len(raw) < HEADER.size:
+            raise ValueError("File too short for a volume header")
+        magic, version, _, *shape, self.chunk_depth, meta_len = HEADER.unpack(raw)
+        if magic != MAGIC:
+            raise ValueError(f"Not a volume file (magic {magic!r})")
+        if version != VERSION:
+            raise ValueError(f"Unsupported volume file version {version}")
+        self.shape = tuple(shape)
+        self.resolution = json.loads(self.f.read(meta_len))
+        self.num_chunks = -(-self.shape[0] // self.chunk_depth)
+        table = self.f.read(INDEX_ENTRY.size * self.num_chunks)
+        self.index = [INDEX_ENTRY.unpack_from(table, i * INDEX_ENTRY.size) for i in range(self.num_chunks)]
+
+    def chunk(self, i):
+        """Planes of chunk i as a (depth, shape[1], shape[2]) boolean array."""
+        offset, length = self.index[i]
+        self.f.seek(offset)
+        depth = min(self.chunk_depth, self.shape[0] - i * self.chunk_depth)
+        bits = np.frombuffer(zlib.decompress(self.f.read(length)), dtype=np.uint8)
+        return np.unpackbits(bits, count=depth * self.shape[1] * self.shape[2]).view(bool).reshape(depth, *self.shape[1:])
+
+    def iter_chunks(self):
+        for i in range(self.num_chunks):
+            yield self.chunk(i)
+
+    def __getitem__(self, key):
+        key = key if isinstance(key, tuple) else (key,)
+        first, rest = key[0], key[1:]
+        if isinstance(first, (int, np.integer)):
+            index = range(self.shape[0])[first]
+            chunk, offset = divmod(index, self.chunk_depth)
+            return self.chunk(chunk)[offset][rest]
+
+        planes = range(self.shape[0])[first]
+        if not len(planes):
+            return np.empty((0, *self.shape[1:]), dtype=bool)[(slice(None),) + rest]
+        lo, hi = min(planes) // self.chunk_depth, max(planes) // self.chunk_depth
+        data = np.concatenate([self.chunk(i) for i in range(lo, hi + 1)])
+        base = lo * self.chunk_depth
+        return data[np.asarray(planes) - base][(slice(None),) + rest]
+
+    def read(self):
+        """Decompress the whole volume."""
+        return np.concatenate(list(self.iter_chunks())) if self.num_chunks else np.empty(self.shape, dtype=bool)
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_volume(path, volume, resolution=None, chunk_depth=8):
+    """Write a whole binary volume to a .kvx file."""
+    volume = np.asarray(volume)
+    with VolumeWriter(path, volume.shape, resolution, chunk_depth) as writer:
+        for start in range(0, len(volume), chunk_depth):
+            writer.write(volume[start:start + chunk_depth])
+
+
+def load_volume(path):
+    """Read a whole .kvx file as (volume, resolution)."""
+    with VolumeReader(path) as reader:
+        return reader.read(), reader.resolution
@@ -0,0 +1,141 @@
+import numpy as np
+
+from .bvh import BVH
+from .instrument import debug
+
+
+def _edge(u, v, p):
+    """2D edge function of points p against edges u->v, all shaped (n, 2+).
+
+    Each edge is evaluated from its lower endpoint in (x, y) order, so the two
+    triangles sharing it get exactly opposite values and the tie rule below
+    agrees on which of them owns a point on the edge.
+    """
+    flip = (u[:, 0] > v[:, 0]) | ((u[:, 0] == v[:, 0]) & (u[:, 1] > v[:, 1]))
+    lo = np.where(flip[:, None], v, u)
+    hi = np.where(flip[:, None], u, v)
+    w = (hi[:, 0] - lo[:, 0]) * (p[:, 1] - lo[:, 1]) - (hi[:, 1] - lo[:, 1]) * (p[:, 0] - lo[:, 0])
+    return np.where(flip, -w, w)
+
+
+def _covers(w, direction):
+    """Inside test for one edge with a top-left tie rule, so a shared edge counts once."""
+    top_left = (direction[:, 1] > 0) | ((direction[:, 1] == 0) & (direction[:, 0] < 0))
+    return (w > 0) | ((w == 0) & top_left)
+
+
+def column_hits(vertices, faces, xy, bvh=None):
+    """Intersect vertical lines through each xy point with a triangle mesh.
+
+    A BVH narrows the (point, triangle) pairs before the exact 2D test. Pass
+    a prebuilt ``bvh`` to reuse it across calls. Returns (point_index, z)
+    arrays with one entry per crossing, unsorted.
+    """
+    if bvh is None:
+        bvh = BVH(vertices, faces)
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+    origins = np.column_stack([xy, np.zeros(len(xy))])
+    pi, ti = bvh.candidates(origins, (0.0, 0.0, 1.0), -np.inf, np.inf)
+    a, b, c, p = bvh.a[ti], bvh.b[ti], bvh.c[ti], xy[pi]
+
+    # Vertical triangles never cross a vertical line; orient the rest counter-clockwise
+    area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+    sign = np.sign(area)
+    inside = area != 0
+    weights = []
+    for u, v in ((b, c), (c, a), (a, b)):
+        w = _edge(u, v, p) * sign
+        inside &= _covers(w, sign[:, None] * (v - u)[:, :2])
+        weights.append(w)
+
+    # Interpolate z from the barycentric weights of each crossing
+    w0, w1, w2 = (w[inside] for w in weights)
+    z = (w0 * a[inside, 2] + w1 * b[inside, 2] + w2 * c[inside, 2]) / np.abs(area[inside])
+    return pi[inside], z
+
+
+def _merge_odd(point_index, hit_z, num_points, tolerance=1e-9):
+    """Drop repeated crossings at the same z from columns with an odd number of crossings."""
+    odd = (np.bincount(point_index, minlength=num_points) & 1).astype(bool)
+    selected = odd[point_index]
+    if not selected.any():
+        return point_index, hit_z
+    order = np.lexsort((hit_z[selected], point_index[selected]))
+    pi, z = point_index[selected][order], hit_z[selected][order]
+    repeat = (pi[1:] == pi[:-1]) & (np.abs(z[1:] - z[:-1]) <= tolerance * np.maximum(1.0, np.abs(z[1:])))
+    keep = np.concatenate([[True], ~repeat])
+    return np.concatenate([point_index[~selected], pi[keep]]), np.concatenate([hit_z[~selected], z[keep]])
+
+
+def fill_columns(point_index, hit_z, num_points, z_samples):
+    """Parity fill: sample k of column i is inside when an odd number of crossings lie below it.
+
+    Columns with an odd number of crossings first have crossings at the
+    same z merged, which a line through a vertex can count twice. One still
+    odd, which only an open mesh produces, is left empty above its last
+    crossing instead of filled to the top.
+    """
+    point_index, hit_z = _merge_odd(point_index, hit_z, num_points)
+    num_z = len(z_samples)
+    # Index of the first sample strictly above each crossing
+    bins = np.searchsorted(z_samples, hit_z, side="right")
+    counts = np.bincount(point_index * (num_z + 1) + bins, minlength=num_points * (num_z + 1))
+    crossings = np.cumsum(counts.reshape(num_points, num_z + 1)[:, :num_z], axis=1)
+    inside = (crossings & 1).astype(bool)
+
+    total = np.bincount(point_index, minlength=num_points)
+    odd = np.flatnonzero(total & 1)
+    if len(odd):
+        debug(f"{len(odd)} column(s) cross the mesh an odd number of times; is it closed?")
+        inside[odd] &= crossings[odd] < total[odd, None]
+    return inside
+
+
+class CylinderGrid:
+    """Cylindrical (r, theta, z) sample grid with precomputed trig tables."""
+
+    def __init__(self, num_radial, num_angular, num_z, radius, z_min, z_max):
+        self.r = np.linspace(0, radius, num_radial)
+        self.theta = np.linspace(0, 2 * np.pi, num_angular)
+        self.z = np.linspace(z_min, z_max, num_z)
+        self.cos = np.cos(self.theta)
+        self.sin = np.sin(self.theta)
+
+    @classmethod
+    def from_bounds(cls, vertices, num_radial=50, num_angular=50, num_z=50):
+        """Grid around the z axis covering a mesh's bounding box."""
+        vertices = np.asarray(vertices)
+        lo, hi = vertices.min(axis=0), vertices.max(axis=0)
+        radius = max(hi[0] - lo[0], hi[1] - lo[1]) / 2
+        return cls(num_radial, num_angular, num_z, radius, lo[2], hi[2])
+
+    @property
+    def shape(self):
+        return len(self.r), len(self.theta), len(self.z)
+
+    def column_xy(self):
+        """Cartesian (x, y) of every (r, theta) column, shaped (radial * angular, 2)."""
+        x = self.r[:, None] * self.cos[None, :]
+        y = self.r[:, None] * self.sin[None, :]
+        return np.stack([x.ravel(), y.ravel()], axis=1)
+
+
+def voxelize_cylinder(vertices, faces, grid, bvh=None):
+    """Inside/outside occupancy of a closed mesh on a cylindrical grid as a (radial, angular, z) int8 array."""
+    xy = grid.column_xy()
+    point_index, hit_z = column_hits(vertices, faces, xy, bvh)
+    inside = fill_columns(point_index, hit_z, len(xy), grid.z)
+    return inside.reshape(grid.shape).astype(np.int8)
+
+
+def voxelize_grid(vertices, faces, x_range, y_range, z_range, bvh=None):
+    """Inside/outside occupancy on a Cartesian grid as an (x, y, z) uint8 array.
+
+    One vertical line per (x, y) column is intersected with the mesh and the
+    column filled by crossing parity, so the cost grows with x * y, not x * y * z.
+    """
+    gx, gy = np.meshgrid(x_range, y_range, indexing="ij")
+    xy = np.column_stack([gx.ravel(), gy.ravel()])
+    point_index, hit_z = column_hits(vertices, faces, xy, bvh)
+    inside = fill_columns(point_index, hit_z, len(xy), np.asarray(z_range))
+    return inside.reshape(len(x_range), len(y_range), len(z_range)).astype(np.uint8)